@@ -1,24 +1,18 @@
 from google.adk.agents import Agent
-import sys
 import os
 
-
-
-# Ensure local xpath_finder is importable
-sys.path.append(os.path.dirname(os.path.abspath(__file__)))
-
 from utils.xpath_finder import find_xpath, find_multiple_xpath
 from utils.tool_read_test_case import tool_read_test_case
 from utils.tool_list_test_cases import tool_list_test_cases
 from utils.edit_tool import edit_file
 from utils.chat_model import get_model
+from utils.prompt_cache import load_prompt
 
 # Load the system prompt from the markdown file
 PROJECT_ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
 SYSTEM_PROMPT_PATH = os.path.join(PROJECT_ROOT, "prompts", "system_prompt.md")
 
-with open(SYSTEM_PROMPT_PATH, 'r') as f:
-    system_prompt = f.read()
+system_prompt = load_prompt(SYSTEM_PROMPT_PATH)
 
 root_agent = Agent(
     model=get_model(),
@@ -12,6 +12,7 @@ sys.path.append(PROJECT_ROOT)
 os.chdir(PROJECT_ROOT)  # edit_tool uses paths relative to project root
 
 from utils.edit_tool import edit_file, TOON_FILE
+from utils.tool_read_test_case import tool_read_test_case
 
 # ── The tool is hardcoded to edit: workspace/intermediate/test_cases_template.toon
 # ── So we back up the real file, test with it, then restore.
@@ -48,7 +49,26 @@ if "EDIT_SUCCESSFUL" in content:
 else:
     print("\n❌ FAILURE: The edit did not persist.")
 
-# 5. Restore original content
+# 5. CRLF file: text copied from tool_read_test_case must work as old_string
+print("\nWriting CRLF content to TOON file...")
+with open(TOON_FILE, "wb") as f:
+    f.write(b"module: TestModule\r\n  tc_id: TC_CRLF_001\r\n  title: x\r\n  steps: y\r\n")
+
+read_back = tool_read_test_case("TC_CRLF_001")
+print(f"Read back: {read_back!r}")
+old_string = "  title: x\n  steps: y"
+if "\r" in read_back or old_string not in read_back:
+    print("❌ FAILURE: tool_read_test_case did not return LF-only text.")
+else:
+    result = edit_file(old_string, "  title: x\n  steps: CRLF_EDIT_SUCCESSFUL")
+    print(f"Result: {result}")
+    with open(TOON_FILE, "r") as f:
+        if "CRLF_EDIT_SUCCESSFUL" in f.read():
+            print("✅ SUCCESS: Read-then-edit works on a CRLF file.")
+        else:
+            print("❌ FAILURE: The CRLF edit did not persist.")
+
+# 6. Restore original content
 if backup is not None:
     with open(TOON_FILE, "w") as f:
         f.write(backup)
@@ -14,6 +14,7 @@ import os
 sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), "..", "..")))
 
 from utils.xpath_finder.tool import find_xpath, find_multiple_xpath
+from utils.xpath_finder.browser import close_browser
 
 
 # ── Configuration ────────────────────────────────────────────────────
@@ -108,8 +109,12 @@ async def main():
     print("🚀 XPath Finder Tool — Simple Test Script")
     print(f"   Target URL: {TEST_URL}")
 
-    await test_find_xpath()
-    await test_find_multiple_xpath()
+    try:
+        await test_find_xpath()
+        await test_find_multiple_xpath()
+    finally:
+        # Close cached pages, the context and the browser before the loop ends
+        await close_browser()
 
     print_separator("Done!")
     print("  ✅ All tests completed.\n")
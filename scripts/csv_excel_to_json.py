@@ -4,8 +4,25 @@ Reads INPUT_DIR from agent_analyzer/.env to find the input file.
 Usage: python csv_excel_to_json.py
 """
 
-import csv, json, os, re, sys
-from collections import OrderedDict
+import csv, json, os, pickle, re, sys
+from concurrent.futures import ProcessPoolExecutor
+from functools import lru_cache
+
+try:
+    import orjson
+except ImportError:
+    orjson = None
+
+try:
+    import pyarrow as pa
+    import pyarrow.csv as pacsv
+except ImportError:
+    pa = pacsv = None
+
+try:
+    from python_calamine import CalamineWorkbook
+except ImportError:
+    CalamineWorkbook = None
 
 try:
     import openpyxl
@@ -19,6 +36,7 @@ REPO_ROOT = os.path.dirname(SCRIPT_DIR)
 ENV_PATH = os.path.join(REPO_ROOT, ".env")
 
 
+@lru_cache(maxsize=None)
 def load_env(path):
     env = {}
     if not os.path.isfile(path):
@@ -32,9 +50,13 @@ def load_env(path):
     return env
 
 
-env = load_env(ENV_PATH)
-INPUT_DIR = env.get("INPUT_DIR", "").strip()
-INTERMEDIATE_DIR = env.get("INTERMEDIATE_DIR", "").strip()
+def get_setting(key, default=""):
+    """Look up *key*, preferring the real environment over the .env file."""
+    return os.environ.get(key) or load_env(ENV_PATH).get(key, default)
+
+
+INPUT_DIR = get_setting("INPUT_DIR").strip()
+INTERMEDIATE_DIR = get_setting("INTERMEDIATE_DIR").strip()
 
 # Resolve relative paths against repo root
 if INPUT_DIR and not os.path.isabs(INPUT_DIR):
@@ -51,87 +73,189 @@ if not INPUT_DIR or not os.path.isdir(INPUT_DIR):
 
 
 
+_NONE_SET = frozenset(("none", "", "null", "n/a"))
+_METHOD_STRIP_RE = re.compile(r"[^a-zA-Z0-9 ]")
+
+
 def sanitize(val):
     if val is None: return None
     s = str(val).strip()
-    return None if s.lower() in ("none", "", "null", "n/a") else s
+    return None if s.lower() in _NONE_SET else s
 
 
 def find_input_file(directory):
     """Find the first .csv or .xlsx file in the directory."""
-    for f in os.listdir(directory):
-        if f.endswith((".csv", ".xlsx", ".xls")):
-            return os.path.join(directory, f)
+    # scandir yields the entry type from readdir, so is_file() needs no stat
+    with os.scandir(directory) as it:
+        for entry in it:
+            if entry.name.endswith((".csv", ".xlsx", ".xls")) and entry.is_file():
+                return entry.path
     return None
 
 
+def _read_csv_arrow(filepath):
+    """Parse a CSV in C++ with threaded readahead; raises pa.ArrowInvalid on malformed input."""
+    with open(filepath, "r", encoding="utf-8-sig") as f:
+        headers = next(csv.reader(f), [])
+    # Every column is read as a string, as DictReader would, so values like
+    # "0123" survive intact. Quoted cells may span lines (Excel exports).
+    table = pacsv.read_csv(
+        filepath,
+        read_options=pacsv.ReadOptions(use_threads=True),
+        parse_options=pacsv.ParseOptions(newlines_in_values=True),
+        convert_options=pacsv.ConvertOptions(column_types={h: pa.string() for h in headers}),
+    )
+    return table.to_pylist()
+
+
 def read_file(filepath):
     ext = os.path.splitext(filepath)[1].lower()
     if ext == ".csv":
+        if pacsv:
+            try:
+                return _read_csv_arrow(filepath)
+            except pa.ArrowInvalid:
+                pass  # e.g. ragged rows or an empty file, which DictReader accepts
         with open(filepath, "r", encoding="utf-8-sig") as f:
             return list(csv.DictReader(f))
     elif ext in (".xlsx", ".xls"):
+        if CalamineWorkbook:
+            # Rust-backed reader; much faster than openpyxl on large workbooks
+            wb = CalamineWorkbook.from_path(filepath)
+            sheet = wb.get_sheet_by_name("Test_Cases") if "Test_Cases" in wb.sheet_names else wb.get_sheet_by_index(0)
+            rows = sheet.to_python()
+            if not rows:
+                return []
+            headers = [str(h).strip() for h in rows[0]]
+            # calamine yields every numeric cell as a float; give whole
+            # numbers back as ints, as openpyxl does ("123456", not "123456.0")
+            return [
+                dict(zip(headers, (int(v) if isinstance(v, float) and v.is_integer() else v for v in row)))
+                for row in rows[1:]
+            ]
         if not openpyxl:
-            print("❌ pip install openpyxl"); sys.exit(1)
-        wb = openpyxl.load_workbook(filepath, data_only=True)
-        ws = wb["Test_Cases"] if "Test_Cases" in wb.sheetnames else wb[wb.sheetnames[0]]
-        headers = [str(h).strip() for h in next(ws.iter_rows(max_row=1, values_only=True))]
-        return [dict(zip(headers, row)) for row in ws.iter_rows(min_row=2, values_only=True)]
+            print("❌ pip install python-calamine (or openpyxl)"); sys.exit(1)
+        # read_only streams rows instead of building the full cell object graph
+        wb = openpyxl.load_workbook(filepath, read_only=True, data_only=True)
+        try:
+            ws = wb["Test_Cases"] if "Test_Cases" in wb.sheetnames else wb[wb.sheetnames[0]]
+            rows = ws.iter_rows(values_only=True)
+            headers = [str(h).strip() for h in next(rows, ())]
+            return [dict(zip(headers, row)) for row in rows]
+        finally:
+            wb.close()
+
+
+# Below this many test cases, process start-up costs more than it saves
+PARALLEL_MIN_TCS = 500
+
+
+def _build_tc(item):
+    """Build one test-case dict from its grouped rows; returns (module, tc)."""
+    tc_id, tc_rows = item
+    first = tc_rows[0]
+    module = sanitize(first.get("Module")) or "Uncategorized"
+
+    steps = []
+    for r in tc_rows:
+        step_no = int(sanitize(r.get("Step_No")) or len(steps) + 1)
+        action = sanitize(r.get("Action")) or ""
+        method = f"step_{step_no:02d}_{'_'.join(_METHOD_STRIP_RE.sub('', action).lower().split())}"
+
+        steps.append({
+            "step_no": step_no,
+            "action": action,
+            "element_type": sanitize(r.get("Element_Type")) or "",
+            "original_hint": sanitize(r.get("Element_Identifier_Hint")) or "",
+            "resolved_locators": {
+                "value": "",
+                "confidence": 0.0,
+                "xpath": "",
+                "fallbacks": []
+            },
+            "input_data": sanitize(r.get("Input_Data")),
+            "expected_result": sanitize(r.get("Expected_Result")) or "",
+            "assertion": {
+                "type": sanitize(r.get("Assertion_Type")) or "",
+                "target": None,
+                "value": None
+            },
+            "method_name": method
+        })
+
+    tc = {
+        "tc_id": tc_id,
+        "title": sanitize(first.get("Test_Case_Title")) or "",
+        "description": sanitize(first.get("Test_Case_Description")) or "",
+        "priority": sanitize(first.get("Priority")) or "",
+        "test_type": sanitize(first.get("Test_Type")) or "",
+        "preconditions": sanitize(first.get("Preconditions")) or "",
+        "steps": steps
+    }
+    return module, tc
 
 
 def convert(rows):
-    groups = OrderedDict()
+    groups = {}
     for row in rows:
         tc_id = sanitize(row.get("TC_ID"))
         if tc_id:
             groups.setdefault(tc_id, []).append(row)
 
-    modules = OrderedDict()
-    for tc_id, tc_rows in groups.items():
-        first = tc_rows[0]
-        module = sanitize(first.get("Module")) or "Uncategorized"
-
-        steps = []
-        for r in tc_rows:
-            step_no = int(sanitize(r.get("Step_No")) or len(steps) + 1)
-            action = sanitize(r.get("Action")) or ""
-            method = f"step_{step_no:02d}_{'_'.join(re.sub(r'[^a-zA-Z0-9 ]', '', action).lower().split())}"
-
-            steps.append({
-                "step_no": step_no,
-                "action": action,
-                "element_type": sanitize(r.get("Element_Type")) or "",
-                "original_hint": sanitize(r.get("Element_Identifier_Hint")) or "",
-                "resolved_locators": {
-                    "value": "",
-                    "confidence": 0.0,
-                    "xpath": "",
-                    "fallbacks": []
-                },
-                "input_data": sanitize(r.get("Input_Data")),
-                "expected_result": sanitize(r.get("Expected_Result")) or "",
-                "assertion": {
-                    "type": sanitize(r.get("Assertion_Type")) or "",
-                    "target": None,
-                    "value": None
-                },
-                "method_name": method
-            })
-
-        tc = {
-            "tc_id": tc_id,
-            "title": sanitize(first.get("Test_Case_Title")) or "",
-            "description": sanitize(first.get("Test_Case_Description")) or "",
-            "priority": sanitize(first.get("Priority")) or "",
-            "test_type": sanitize(first.get("Test_Type")) or "",
-            "preconditions": sanitize(first.get("Preconditions")) or "",
-            "steps": steps
-        }
+    # Test cases are independent, so large inputs are built in parallel
+    if len(groups) >= PARALLEL_MIN_TCS:
+        with ProcessPoolExecutor() as ex:
+            built = list(ex.map(_build_tc, groups.items(), chunksize=64))
+    else:
+        built = [_build_tc(item) for item in groups.items()]
+
+    modules = {}
+    for module, tc in built:
         modules.setdefault(module, []).append(tc)
 
     return [{"module": m, "test_cases": tcs} for m, tcs in modules.items()]
 
 
+# Part of every load_test_cases cache name; bump it whenever convert's output
+# changes so caches written by an older version are not loaded
+CACHE_VERSION = 1
+
+
+def load_test_cases(input_file, cache_dir=None):
+    """read_file + convert, cached in *cache_dir* keyed on the input's name, mtime and size.
+
+    Re-running a conversion on an unchanged input loads the cached result
+    instead of re-parsing the whole file.  Stale caches for the same input
+    are removed when a new one is written.
+    """
+    if not cache_dir:
+        return convert(read_file(input_file))
+
+    st = os.stat(input_file)
+    base = os.path.basename(input_file)
+    cache_name = f".cache_{base}_v{CACHE_VERSION}_{st.st_mtime_ns}_{st.st_size}.pkl"
+    cache_path = os.path.join(cache_dir, cache_name)
+    try:
+        with open(cache_path, "rb") as f:
+            return pickle.load(f)
+    except (OSError, EOFError, pickle.UnpicklingError):
+        pass
+
+    data = convert(read_file(input_file))
+    # Only this input's caches: the full name is matched, so tests.csv and
+    # tests.xlsx, or a.csv and a_b.csv, never remove each other's
+    stale_re = re.compile(rf"\.cache_{re.escape(base)}_v\d+_\d+_\d+\.pkl")
+    try:
+        for name in os.listdir(cache_dir):
+            if stale_re.fullmatch(name):
+                os.remove(os.path.join(cache_dir, name))
+        with open(cache_path, "wb") as f:
+            pickle.dump(data, f, protocol=5)
+    except OSError:
+        pass  # caching is best-effort
+    return data
+
+
 if __name__ == "__main__":
     input_file = find_input_file(INPUT_DIR)
     if not input_file:
@@ -146,11 +270,14 @@ if __name__ == "__main__":
     output_file = os.path.join(output_dir, os.path.splitext(os.path.basename(input_file))[0] + "_output.json")
 
     print(f"📂 Input  : {input_file}")
-    rows = read_file(input_file)
-    result = convert(rows)
-
-    with open(output_file, "w", encoding="utf-8") as f:
-        json.dump(result, f, indent=2, ensure_ascii=False)
+    result = load_test_cases(input_file, INTERMEDIATE_DIR if os.path.isdir(INTERMEDIATE_DIR) else None)
+
+    if orjson:
+        with open(output_file, "wb") as f:
+            f.write(orjson.dumps(result, option=orjson.OPT_INDENT_2))
+    else:
+        with open(output_file, "w", encoding="utf-8") as f:
+            json.dump(result, f, indent=2, ensure_ascii=False)
 
     total_tc = sum(len(m["test_cases"]) for m in result)
     total_steps = sum(len(tc["steps"]) for m in result for tc in m["test_cases"])
@@ -2,6 +2,7 @@
 csv_excel_to_toon.py — Convert CSV/Excel test cases to JSON and TOON format.
 Reads INPUT_DIR from agent_analyzer/.env to find the input file.
 Saves output JSON and TOON files to INTERMEDIATE_DIR.
+The JSON is written compact (it is machine-consumed); pass --pretty to indent it.
 """
 
 import json
@@ -24,20 +25,25 @@ except ImportError:
         print("Please install it using: pip install toon-python")
         sys.exit(1)
 
+try:
+    import orjson
+except ImportError:
+    orjson = None
+
 # Import necessary functions from csv_excel_to_json.py
 try:
-    from csv_excel_to_json import load_env, find_input_file, read_file, convert, REPO_ROOT
+    from csv_excel_to_json import get_setting, find_input_file, load_test_cases, REPO_ROOT
 except ImportError:
     print("❌ Could not import from csv_excel_to_json.py. Make sure it exists in the same directory.")
     sys.exit(1)
 
 def main():
     # 1. Load configuration from .env
+    # (parsed once and cached by csv_excel_to_json; real env vars take priority)
     ENV_PATH = os.path.join(REPO_ROOT, ".env")
-    env = load_env(ENV_PATH)
     
-    INPUT_DIR = env.get("INPUT_DIR", "").strip()
-    INTERMEDIATE_DIR = env.get("INTERMEDIATE_DIR", "").strip()
+    INPUT_DIR = get_setting("INPUT_DIR").strip()
+    INTERMEDIATE_DIR = get_setting("INTERMEDIATE_DIR").strip()
 
     # Resolve paths relative to REPO_ROOT if they are not absolute
     if INPUT_DIR and not os.path.isabs(INPUT_DIR):
@@ -57,17 +63,16 @@ def main():
 
     print(f"📂 Input  : {input_file}")
     
+    # Prepare output paths
+    if INTERMEDIATE_DIR and not os.path.exists(INTERMEDIATE_DIR):
+        os.makedirs(INTERMEDIATE_DIR, exist_ok=True)
+    
     try:
-        rows = read_file(input_file)
-        data = convert(rows)
+        data = load_test_cases(input_file, INTERMEDIATE_DIR if os.path.isdir(INTERMEDIATE_DIR) else None)
     except Exception as e:
         print(f"❌ Error converting file: {e}")
         sys.exit(1)
 
-    # Prepare output paths
-    if INTERMEDIATE_DIR and not os.path.exists(INTERMEDIATE_DIR):
-        os.makedirs(INTERMEDIATE_DIR, exist_ok=True)
-    
     # Use INTERMEDIATE_DIR for output, fallback to INPUT_DIR
     output_dir = INTERMEDIATE_DIR if INTERMEDIATE_DIR and os.path.isdir(INTERMEDIATE_DIR) else INPUT_DIR
     base_name = os.path.splitext(os.path.basename(input_file))[0]
@@ -77,8 +82,13 @@ def main():
 
     # 3. Save as JSON
     print(f"💾 Saving JSON to: {json_output_file}")
-    with open(json_output_file, "w", encoding="utf-8") as f:
-        json.dump(data, f, indent=2, ensure_ascii=False)
+    pretty = "--pretty" in sys.argv[1:]
+    if orjson:
+        with open(json_output_file, "wb") as f:
+            f.write(orjson.dumps(data, option=orjson.OPT_INDENT_2 if pretty else 0))
+    else:
+        with open(json_output_file, "w", encoding="utf-8") as f:
+            json.dump(data, f, indent=2 if pretty else None, ensure_ascii=False)
 
     # 4. Convert to TOON and save
     print(f"🔄 Converting to TOON format...")
@@ -9,12 +9,19 @@ The project path is read from the .env file (OUTPUT_DIR variable)
 located in agent_analyzer/.env (relative to the repo root).
 
 No external dependencies required — runs with plain Python 3.
+If lxml is installed, testng.xml is updated through its parser instead
+of a regex over the raw text.
 """
 
 import re
 import os
 import sys
 
+try:
+    from lxml import etree
+except ImportError:
+    etree = None
+
 
 # ── Minimal .env parser (no dependencies) ──────────────────────────────
 def load_env(env_path: str) -> dict[str, str]:
@@ -60,6 +67,19 @@ JAVA_FILE = os.path.join(
 TESTNG_XML = os.path.join(OUTPUT_DIR, "testng.xml")
 
 
+# ── Precompiled patterns ──────────────────────────────────────────────
+# @Test (optionally with arguments) followed by public void methodName(
+# The argument list is matched without lazy backtracking; quoted strings
+# may contain parentheses, and one level of nested parentheses is allowed
+# (e.g. timeOut = Constants.of(5)).
+_TEST_RE = re.compile(
+    rb'@Test(?:\s*\((?:"(?:\\.|[^"\\])*"|\([^()]*\)|[^()"])*\))?\s+public\s+void\s+(\w+)\s*\('
+)
+_METHODS_RE = re.compile(r"<methods>.*?</methods>", re.DOTALL)
+# Optional BOM and XML declaration plus the whitespace after them
+_PROLOG_RE = re.compile(rb"(?:\xef\xbb\xbf)?(?:<\?xml[^>]*\?>)?\s*")
+
+
 # ── Step 1: Extract @Test method names from the Java file ─────────────
 def extract_test_methods(java_path: str) -> list[str]:
     """Return a list of method names that are annotated with @Test."""
@@ -67,13 +87,10 @@ def extract_test_methods(java_path: str) -> list[str]:
         print(f"❌ ERROR: Java file not found: {java_path}")
         sys.exit(1)
 
-    with open(java_path, "r") as f:
+    with open(java_path, "rb") as f:
         content = f.read()
 
-    # Pattern: @Test (possibly with parameters) followed by public void methodName(
-    pattern = r"@Test(?:\s*\(.*?\))?\s+public\s+void\s+(\w+)\s*\("
-    methods = re.findall(pattern, content, re.DOTALL)
-    return methods
+    return [name.decode() for name in _TEST_RE.findall(content)]
 
 
 # ── Step 2: Update testng.xml ─────────────────────────────────────────
@@ -86,28 +103,62 @@ def update_testng_xml(xml_path: str, methods: list[str]) -> None:
         print(f"❌ ERROR: testng.xml not found: {xml_path}")
         sys.exit(1)
 
+    if etree is not None:
+        _update_testng_xml_lxml(xml_path, methods)
+        return
+
     with open(xml_path, "r") as f:
         xml_content = f.read()
 
     # Build the new <include .../> block
-    include_lines = ""
-    for i, method in enumerate(methods, start=1):
-        include_lines += f'                    <!-- TC{i:02d} -->\n'
-        include_lines += f'                    <include name="{method}"/>\n'
+    include_lines = "".join(
+        f'                    <!-- TC{i:02d} -->\n'
+        f'                    <include name="{method}"/>\n'
+        for i, method in enumerate(methods, start=1)
+    )
 
     # Replace everything between <methods> ... </methods>
     new_block = f"<methods>\n{include_lines}                </methods>"
-    updated_xml = re.sub(
-        r"<methods>.*?</methods>",
-        new_block,
-        xml_content,
-        flags=re.DOTALL,
-    )
+    updated_xml = _METHODS_RE.sub(lambda _: new_block, xml_content)
 
     with open(xml_path, "w") as f:
         f.write(updated_xml)
 
 
+def _update_testng_xml_lxml(xml_path: str, methods: list[str]) -> None:
+    """lxml variant of update_testng_xml: same output bytes, real XML parsing.
+
+    Only the children of each <methods> element are rewritten.  lxml
+    re-serializes the rest of the document, so the XML declaration (with any
+    BOM) and the trailing newline are copied from the input, as the regex
+    path leaves them.
+    """
+    with open(xml_path, "rb") as f:
+        # The same newline translation the regex path's text-mode read applies
+        raw = f.read().replace(b"\r\n", b"\n").replace(b"\r", b"\n")
+
+    tree = etree.fromstring(raw).getroottree()
+    item_indent = "\n" + " " * 20
+    close_indent = "\n" + " " * 16
+
+    for methods_el in tree.iter("methods"):
+        for child in list(methods_el):
+            methods_el.remove(child)
+        methods_el.text = item_indent if methods else close_indent
+        for i, method in enumerate(methods, start=1):
+            comment = etree.Comment(f" TC{i:02d} ")
+            comment.tail = item_indent
+            methods_el.append(comment)
+            include = etree.SubElement(methods_el, "include", name=method)
+            include.tail = item_indent if i < len(methods) else close_indent
+
+    head = _PROLOG_RE.match(raw).group()
+    body = etree.tostring(tree, encoding="UTF-8", xml_declaration=False)
+    tail = raw[len(raw.rstrip()):]
+    with open(xml_path, "wb") as f:
+        f.write(head + body + tail)
+
+
 # ── Main ──────────────────────────────────────────────────────────────
 if __name__ == "__main__":
     print(f"📂 .env file  : {ENV_PATH}")
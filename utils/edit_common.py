@@ -0,0 +1,121 @@
+"""
+edit_common.py
+==============
+
+Byte-level helpers shared by the two ``edit_file`` tools
+(``file_tools.edit_file`` and ``edit_tool.edit_file``).
+
+Edits work on the raw UTF-8 bytes of a file: UTF-8 is self-synchronizing,
+so byte matches are exactly the text matches, and the scans run in C
+(memmem) with no decoded copy of the file.  A rewrite goes to a temp file
+that is renamed into place, so a crash mid-write never leaves a truncated
+file.
+
+Note
+----
+Standard library only, like the tools that use it.
+"""
+
+import os
+import stat
+import tempfile
+
+_WRITE_CHUNK_BYTES = 1 << 20
+
+# fsync each rewrite before renaming it into place. Off by default: the
+# rename is already atomic, this only adds durability across power loss.
+DURABLE_WRITES = False
+
+
+def open_regular(path):
+    """Open *path* read-only without following a final symlink.
+
+    One open + fstat stands in for separate exists/is_file/stat lookups and
+    closes the window between checking a path and opening it.
+
+    Returns:
+        tuple | None: ``(fd, stat_result)``, or ``None`` if *path* does not
+        exist or is not a regular file.  The caller owns (must close) *fd*.
+    """
+    try:
+        fd = os.open(path, os.O_RDONLY | getattr(os, "O_NOFOLLOW", 0))
+    except FileNotFoundError:
+        return None
+    st = os.fstat(fd)
+    if not stat.S_ISREG(st.st_mode):
+        os.close(fd)
+        return None
+    return fd, st
+
+
+def to_lf(buf):
+    """Translate CRLF and lone CR to LF, as a text-mode read would.
+
+    Returns *buf* itself (bytes, bytearray or mmap) when it holds no CR.
+    """
+    if buf.find(b"\r") == -1:
+        return buf
+    return bytes(buf).replace(b"\r\n", b"\n").replace(b"\r", b"\n")
+
+
+def find_all(buf, sub: bytes) -> list[int]:
+    """Offsets of the non-overlapping occurrences of *sub* in *buf* (bytes or mmap).
+
+    One left-to-right scan; the offsets serve both to count matches and to
+    splice the replacement, so the buffer is only traversed once.
+    """
+    offsets = []
+    if not sub:
+        return offsets
+    idx = buf.find(sub)
+    while idx != -1:
+        offsets.append(idx)
+        idx = buf.find(sub, idx + len(sub))
+    return offsets
+
+
+def splice(buf, offsets: list[int], old_len: int, new: bytes) -> bytearray:
+    """Copy *buf* into a pre-sized buffer with each match at *offsets* replaced by *new*."""
+    out = bytearray(len(buf) + len(offsets) * (len(new) - old_len))
+    pos = 0
+    start = 0
+    with memoryview(buf) as src:
+        for idx in offsets:
+            n = idx - start
+            out[pos:pos + n] = src[start:idx]
+            pos += n
+            out[pos:pos + len(new)] = new
+            pos += len(new)
+            start = idx + old_len
+        out[pos:] = src[start:]
+    return out
+
+
+def atomic_write(path, data, mode: int):
+    """Replace *path* with *data*, giving the new file permission bits *mode*.
+
+    The data goes to a temp file in the same directory that is then renamed
+    over *path*.  Renaming also replaces a symlink planted at the path
+    instead of writing through it.
+    """
+    fd, tmp_path = tempfile.mkstemp(dir=os.path.dirname(path), prefix=".edit_", suffix=".tmp")
+    try:
+        # os.chmod on the path: os.fchmod is missing on Windows before 3.13
+        os.chmod(tmp_path, stat.S_IMODE(mode))
+        with memoryview(data) as view:
+            written = 0
+            while written < len(view):
+                written += os.write(fd, view[written:written + _WRITE_CHUNK_BYTES])
+        if DURABLE_WRITES:
+            os.fsync(fd)
+        os.close(fd)
+        fd = -1
+        os.replace(tmp_path, path)
+    except BaseException:
+        if fd != -1:
+            os.close(fd)
+        try:
+            os.unlink(tmp_path)
+        except OSError:
+            pass
+        raise
@@ -1,4 +1,10 @@
 import os
+import mmap
+
+try:
+    from utils.edit_common import open_regular, to_lf, find_all, splice, atomic_write
+except ImportError:  # run as a script: utils/ itself is on sys.path
+    from edit_common import open_regular, to_lf, find_all, splice, atomic_write
 
 PROJECT_PATH = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
 
@@ -26,6 +32,9 @@ def edit_file(
                      If False (default) and more than one occurrence exists,
                      an error is returned asking for more context.
 
+    An empty old_string is rejected, and an edit where old_string equals
+    new_string returns immediately with 0 occurrences (the file is untouched).
+
     Returns:
         On success:
             {
@@ -37,24 +46,42 @@ def edit_file(
                 "error": str         # human-readable error message
             }
     """
-    if not os.path.exists(TOON_FILE) or not os.path.isfile(TOON_FILE):
-        return {"error": f"TOON file not found at {TOON_FILE}"}
+    # Reject malformed / no-op edits before touching the file
+    if not old_string:
+        return {"error": "old_string must be non-empty"}
+    if old_string == new_string:
+        return {
+            "path": "workspace/intermediate/test_cases_template.toon",
+            "occurrences": 0,
+        }
 
     try:
-        # Prevent symlink attacks (basic check)
-        fd = os.open(TOON_FILE, os.O_RDONLY | getattr(os, "O_NOFOLLOW", 0))
-        with os.fdopen(fd, "r", encoding="utf-8") as f:
-            content = f.read()
-
         MAX_FILE_SIZE_MB = 10
         MAX_FILE_SIZE_BYTES = MAX_FILE_SIZE_MB * 1024 * 1024
 
-        stat = os.stat(TOON_FILE)
-        if stat.st_size > MAX_FILE_SIZE_BYTES:
-            return {"error": "File exceeds maximum allowed size (10MB)"}
+        old_b = old_string.encode("utf-8")
+        new_b = new_string.encode("utf-8")
 
-        occurrences = content.count(old_string)
+        opened = open_regular(TOON_FILE)
+        if opened is None:
+            return {"error": f"TOON file not found at {TOON_FILE}"}
+        fd, st = opened
+        if st.st_size > MAX_FILE_SIZE_BYTES:
+            os.close(fd)
+            return {"error": "File exceeds maximum allowed size (10MB)"}
 
+        with os.fdopen(fd, "rb") as f:
+            if st.st_size == 0:
+                offsets = []
+            else:
+                with mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ) as mm:
+                    # Multi-line old_strings must match CRLF files too
+                    buf = to_lf(mm)
+                    offsets = find_all(buf, old_b)
+                    if offsets and (len(offsets) == 1 or replace_all):
+                        new_content = splice(buf, offsets, len(old_b), new_b)
+
+        occurrences = len(offsets)
         if occurrences == 0:
             return {"error": f"String not found in file: '{old_string}'"}
 
@@ -67,20 +94,12 @@ def edit_file(
                 )
             }
 
-        new_content = content.replace(old_string, new_string)
-
-        flags = os.O_WRONLY | os.O_TRUNC
-        if hasattr(os, "O_NOFOLLOW"):
-            flags |= os.O_NOFOLLOW
-
-        fd = os.open(TOON_FILE, flags)
-        with os.fdopen(fd, "w", encoding="utf-8") as f:
-            f.write(new_content)
+        atomic_write(TOON_FILE, new_content, st.st_mode)
 
         return {
             "path": "workspace/intermediate/test_cases_template.toon",
             "occurrences": int(occurrences),
         }
 
-    except (OSError, UnicodeDecodeError, UnicodeEncodeError) as e:
+    except (OSError, ValueError, UnicodeEncodeError) as e:
         return {"error": f"Error editing TOON file: {e}"}
@@ -20,12 +20,27 @@ library so it can be used with any agent framework (Google ADK, LangChain, etc.)
 """
 
 import os
+import stat
 from pathlib import Path
 
+try:
+    from utils.edit_common import open_regular, to_lf, find_all, splice, atomic_write
+except ImportError:  # run as a script: utils/ itself is on sys.path
+    from edit_common import open_regular, to_lf, find_all, splice, atomic_write
+
 PROJECT_PATH = Path(os.path.dirname(os.path.dirname(os.path.abspath(__file__)))) / "workspace" / "output" / "testing-templates"
 
 MAX_FILE_SIZE_MB = 10
 MAX_FILE_SIZE_BYTES = MAX_FILE_SIZE_MB * 1024 * 1024
+_READ_CHUNK_BYTES = 1 << 20
+
+# Resolved once at import; every tool call compares against these.
+_PROJECT_ROOT = PROJECT_PATH.resolve()
+_PROJECT_ROOT_STR = str(_PROJECT_ROOT)
+_PROJECT_ROOT_PREFIX = os.path.join(_PROJECT_ROOT_STR, "")
+
+# Entries list_directory leaves out, besides dot-files
+_SKIP_NAMES = frozenset({"__pycache__"})
 
 
 # ──────────────────────────────────────────────
@@ -37,16 +52,56 @@ def _resolve_safe(relative_path: str) -> Path | None:
 
     Returns the resolved ``Path`` on success, or ``None`` if the path
     would escape the project root (path-traversal protection).
+
+    ``..`` traversal is caught syntactically with ``normpath``, without any
+    syscalls.  Only the components below the (pre-resolved) root are then
+    ``lstat``-ed, and a full ``resolve()`` is paid for only when one of them
+    is a symlink that could point elsewhere.
     """
-    resolved = (PROJECT_PATH / relative_path).resolve()
-    if not str(resolved).startswith(str(PROJECT_PATH.resolve())):
+    norm = os.path.normpath(os.path.join(_PROJECT_ROOT_STR, relative_path))
+    # Compare against "root/" so a sibling like "root-other" is not accepted
+    if norm != _PROJECT_ROOT_STR and not norm.startswith(_PROJECT_ROOT_PREFIX):
         return None
-    return resolved
 
+    if norm == _PROJECT_ROOT_STR:
+        return _PROJECT_ROOT
+
+    current = _PROJECT_ROOT_STR
+    for part in norm[len(_PROJECT_ROOT_PREFIX):].split(os.sep):
+        current = os.path.join(current, part)
+        try:
+            is_link = stat.S_ISLNK(os.lstat(current).st_mode)
+        except OSError:
+            break  # nothing further down exists, so nothing can be a symlink
+        if is_link:
+            resolved = Path(norm).resolve()
+            s = str(resolved)
+            if s != _PROJECT_ROOT_STR and not s.startswith(_PROJECT_ROOT_PREFIX):
+                return None
+            return resolved
+    return Path(norm)
+
+
+def _read_exact(fd: int, size: int) -> bytearray:
+    """Read up to *size* bytes from *fd* into one preallocated buffer.
+
+    Fills the buffer in place with an unbuffered ``readinto`` (no per-chunk
+    bytes objects, no text-decoding wrapper) and closes *fd*.  Stops early at
+    EOF, so a file that shrank since it was stat'ed is returned short rather
+    than padded.
+    """
+    buf = bytearray(size)
+    filled = 0
+    with os.fdopen(fd, "rb", buffering=0) as f, memoryview(buf) as view:
+        while filled < size:
+            n = f.readinto(view[filled:filled + _READ_CHUNK_BYTES])
+            if not n:
+                break
+            filled += n
+    if filled < size:
+        del buf[filled:]
+    return buf
 
-# ──────────────────────────────────────────────
-# Tool 1 – read_file
-# ──────────────────────────────────────────────
 
 def read_file(file_path: str) -> dict:
     """Read the contents of a file.
@@ -75,20 +130,25 @@ def read_file(file_path: str) -> dict:
     if resolved is None:
         return {"error": f"Access denied: path '{file_path}' is outside the project."}
 
-    if not resolved.exists():
-        return {"error": f"File not found: '{file_path}'"}
-
-    if not resolved.is_file():
-        return {"error": f"Not a file: '{file_path}' (maybe a directory?)"}
-
     try:
-        size = resolved.stat().st_size
+        # One open + fstat stands in for separate exists/is_file/stat lookups
+        try:
+            fd = os.open(resolved, os.O_RDONLY | getattr(os, "O_NOFOLLOW", 0))
+        except FileNotFoundError:
+            return {"error": f"File not found: '{file_path}'"}
+        st = os.fstat(fd)
+        if not stat.S_ISREG(st.st_mode):
+            os.close(fd)
+            return {"error": f"Not a file: '{file_path}' (maybe a directory?)"}
+        size = st.st_size
         if size > MAX_FILE_SIZE_BYTES:
+            os.close(fd)
             return {"error": f"File '{file_path}' exceeds maximum size ({MAX_FILE_SIZE_MB}MB)."}
 
-        fd = os.open(resolved, os.O_RDONLY | getattr(os, "O_NOFOLLOW", 0))
-        with os.fdopen(fd, "r", encoding="utf-8") as f:
-            content = f.read()
+        content = _read_exact(fd, size).decode("utf-8")
+        if "\r" in content:
+            # Same universal-newline translation text-mode reads applied
+            content = content.replace("\r\n", "\n").replace("\r", "\n")
 
         return {"path": file_path, "content": content}
 
@@ -141,12 +201,15 @@ def list_directory(path: str = ".") -> dict:
         return {"error": f"Not a directory: '{path}' (maybe a file?)"}
 
     try:
-        entries = []
-        for item in sorted(resolved.iterdir()):
+        # scandir returns each entry's type from readdir, so only regular
+        # files need a stat call (for their size)
+        with os.scandir(resolved) as it:
             # Skip hidden files/dirs and __pycache__
-            if item.name.startswith(".") or item.name == "__pycache__":
-                continue
+            items = [e for e in it if not (e.name[:1] == "." or e.name in _SKIP_NAMES)]
+        items.sort(key=lambda e: e.name)
 
+        entries = []
+        for item in items:
             if item.is_dir():
                 entries.append({"name": item.name, "type": "directory"})
             elif item.is_file():
@@ -212,22 +275,24 @@ def edit_file(
     if resolved is None:
         return {"error": f"Access denied: path '{file_path}' is outside the project."}
 
-    if not resolved.exists() or not resolved.is_file():
-        return {"error": f"File not found: '{file_path}'"}
-
     try:
-        # Check file size
-        size = resolved.stat().st_size
+        old_b = old_string.encode("utf-8")
+        new_b = new_string.encode("utf-8")
+
+        opened = open_regular(resolved)
+        if opened is None:
+            return {"error": f"File not found: '{file_path}'"}
+        fd, st = opened
+        size = st.st_size
         if size > MAX_FILE_SIZE_BYTES:
+            os.close(fd)
             return {"error": f"File '{file_path}' exceeds maximum size ({MAX_FILE_SIZE_MB}MB)."}
 
-        # Read (with symlink protection)
-        fd = os.open(resolved, os.O_RDONLY | getattr(os, "O_NOFOLLOW", 0))
-        with os.fdopen(fd, "r", encoding="utf-8") as f:
-            content = f.read()
+        raw = to_lf(_read_exact(fd, size))
 
-        # Count occurrences
-        occurrences = content.count(old_string)
+        # Find every occurrence in a single scan
+        offsets = find_all(raw, old_b)
+        occurrences = len(offsets)
 
         if occurrences == 0:
             return {"error": f"String not found in file: '{old_string}'"}
@@ -241,20 +306,13 @@ def edit_file(
                 )
             }
 
-        # Perform replacement
-        new_content = content.replace(old_string, new_string)
+        # Replacing a string with itself changes nothing; skip the rewrite
+        if old_b == new_b:
+            return {"path": file_path, "occurrences": int(occurrences)}
 
-        # Write back (with symlink protection)
-        flags = os.O_WRONLY | os.O_TRUNC
-        if hasattr(os, "O_NOFOLLOW"):
-            flags |= os.O_NOFOLLOW
-        fd = os.open(resolved, flags)
-        with os.fdopen(fd, "w", encoding="utf-8") as f:
-            f.write(new_content)
+        atomic_write(resolved, splice(raw, offsets, len(old_b), new_b), st.st_mode)
 
         return {"path": file_path, "occurrences": int(occurrences)}
 
-    except UnicodeDecodeError:
-        return {"error": f"Cannot edit '{file_path}': file is not valid UTF-8 text."}
     except (OSError, UnicodeEncodeError) as e:
         return {"error": f"Error editing file '{file_path}': {e}"}
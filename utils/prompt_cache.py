@@ -0,0 +1,18 @@
+from functools import lru_cache
+
+
+@lru_cache(maxsize=None)
+def load_prompt(path: str) -> str:
+    """Read a prompt file once per process and return its contents.
+
+    Repeated calls with the same path (e.g. re-importing an agent module or
+    building several agents in one process) are served from memory.
+
+    Args:
+        path: Path to the prompt file (typically a markdown file under prompts/).
+
+    Returns:
+        The file contents as a string.
+    """
+    with open(path, 'r') as f:
+        return f.read()
@@ -5,6 +5,7 @@ Run:  python utils/test_file_tools.py
 
 import os
 import sys
+import textwrap
 
 # Ensure project root is on the path
 sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
@@ -12,6 +13,7 @@ sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
 from utils.file_tools import read_file, list_directory, edit_file, PROJECT_PATH
 
 SEPARATOR = "=" * 60
+PREVIEW_CHARS = 2048
 
 # We'll use a temp file under workspace/ for testing
 TEST_FILE_REL = "workspace/test_file_tools_temp.txt"
@@ -33,6 +35,25 @@ def cleanup():
         print(f"\n🧹 Cleaned up: {TEST_FILE_REL}")
 
 
+def print_entries(entries):
+    """Print a directory listing in one call."""
+    lines = []
+    for entry in entries:
+        icon = "📁" if entry["type"] == "directory" else "📄"
+        size = f" ({entry.get('size_bytes', '?')} bytes)" if entry["type"] == "file" else ""
+        lines.append(f"   {icon} {entry['name']}{size}")
+    if lines:
+        print("\n".join(lines))
+
+
+def print_content(content):
+    """Print at most PREVIEW_CHARS of *content*, each line prefixed with '   | '."""
+    preview = content[:PREVIEW_CHARS].rstrip("\n")
+    print(textwrap.indent(preview, "   | ", lambda line: True))
+    if len(content) > PREVIEW_CHARS:
+        print(f"   | ... ({len(content) - PREVIEW_CHARS} more chars)")
+
+
 def test_list_directory():
     print(SEPARATOR)
     print("TEST: list_directory")
@@ -44,10 +65,7 @@ def test_list_directory():
     if "error" in result:
         print(f"   ❌ {result['error']}")
     else:
-        for entry in result["entries"]:
-            icon = "📁" if entry["type"] == "directory" else "📄"
-            size = f" ({entry.get('size_bytes', '?')} bytes)" if entry["type"] == "file" else ""
-            print(f"   {icon} {entry['name']}{size}")
+        print_entries(result["entries"])
 
     # List workspace
     result2 = list_directory("workspace")
@@ -55,10 +73,7 @@ def test_list_directory():
     if "error" in result2:
         print(f"   ❌ {result2['error']}")
     else:
-        for entry in result2["entries"]:
-            icon = "📁" if entry["type"] == "directory" else "📄"
-            size = f" ({entry.get('size_bytes', '?')} bytes)" if entry["type"] == "file" else ""
-            print(f"   {icon} {entry['name']}{size}")
+        print_entries(result2["entries"])
 
     # Error case: non-existent directory
     result3 = list_directory("does_not_exist")
@@ -84,8 +99,7 @@ def test_read_file():
     else:
         print(f"   ✅ path: {result['path']}")
         print(f"   Content:\n   ---")
-        for line in result["content"].splitlines():
-            print(f"   | {line}")
+        print_content(result["content"])
         print("   ---")
 
     # Read .env file
@@ -121,8 +135,7 @@ def test_edit_file():
     verify = read_file(TEST_FILE_REL)
     if "content" in verify:
         print(f"   File now reads:")
-        for line in verify["content"].splitlines():
-            print(f"   | {line}")
+        print_content(verify["content"])
 
     # --- Test 3: Replace a unique string
     print("\n🔧 Test 3: edit_file — unique string replacement")
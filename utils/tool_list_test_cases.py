@@ -1,9 +1,101 @@
 import json
+import mmap
 import re
 import os
+from functools import lru_cache
 
-def get_indentation(line):
-    return len(line) - len(line.lstrip())
+TC_KEY = b'tc_id:'
+
+def iter_tc_lines(data):
+    """
+    Yield (start, end, indent, raw_id) for every "tc_id:" line in *data*.
+
+    A "tc_id:" line is one where only spaces/tabs precede the key and at
+    least one character follows it; start/end are the offsets of the line
+    (end excludes the newline) and raw_id is the rest of the line after the
+    key, unstripped.  Candidates are located with find(), which runs as a
+    memmem-style C search, so lines without the key are never looked at.
+    """
+    pos = data.find(TC_KEY)
+    while pos != -1:
+        start = data.rfind(b'\n', 0, pos) + 1
+        end = data.find(b'\n', pos)
+        if end == -1:
+            end = len(data)
+        prefix = data[start:pos]
+        if end > pos + len(TC_KEY) and (not prefix or prefix.isspace()):
+            yield start, end, len(prefix), data[pos + len(TC_KEY):end]
+        # At most one tc_id per line: resume on the next line
+        pos = data.find(TC_KEY, end)
+
+@lru_cache(maxsize=None)
+def _dedent_re(indent):
+    """Regex for a non-blank line indented less than *indent* columns."""
+    return re.compile(rb'^[^\S\n]{0,%d}\S' % (indent - 1), re.MULTILINE)
+
+def scan_toon_blocks(data):
+    """
+    Find every test-case block in raw TOON bytes (a bytes object or mmap).
+
+    A block starts at a "tc_id:" line and ends right before the next
+    "tc_id:" line, or before the first non-blank line indented less than
+    the "tc_id:" line, or at the end of the file.
+
+    Rather than visiting every line in Python, a find() loop locates the
+    "tc_id:" lines and one regex search per block finds its dedent; line
+    numbers come from counting newlines (in C) between those points.
+
+    Returns a list of dicts:
+    {"id": str, "sl": int, "el": int, "indent": int, "start": int, "end": int}
+    with 1-based inclusive line numbers and the block's byte range
+    data[start:end] (whole lines, including the last line's newline).
+    """
+    blocks = []
+    matches = iter_tc_lines(data)
+    match = next(matches, None)
+
+    # Running (offset -> line number) cursor; queries arrive in file order
+    cur_pos, cur_line = 0, 1
+    def line_at(pos):
+        nonlocal cur_pos, cur_line
+        # Slice-then-count works on mmap too (mmap.count is 3.13+)
+        cur_line += data[cur_pos:pos].count(b'\n')
+        cur_pos = pos
+        return cur_line
+
+    while match is not None:
+        # One match of lookahead: the next tc_id line bounds this block
+        next_match = next(matches, None)
+        line_start, line_end, indent, raw_id = match
+        sl = line_at(line_start)
+        next_start = next_match[0] if next_match else len(data)
+
+        el = None
+        if indent > 0:
+            dedent = _dedent_re(indent).search(data, line_end, next_start)
+            if dedent:
+                end = dedent.start()
+                el = line_at(end) - 1
+        if el is None:
+            end = next_start
+            if next_match:
+                el = line_at(end) - 1
+            else:
+                # End of file: count the last line even without a trailing newline
+                el = line_at(end) - (1 if data[-1:] in (b'\n', b'') else 0)
+
+        tc_id = raw_id.decode('utf-8').strip()
+        blocks.append({
+            "id": tc_id,
+            "sl": sl,
+            "el": el,
+            "indent": indent,
+            "start": line_start,
+            "end": end,
+        })
+        match = next_match
+
+    return blocks
 
 def tool_list_test_cases():
     """
@@ -18,76 +110,33 @@ def tool_list_test_cases():
     file_path = os.path.join(project_root, "workspace", "intermediate", "test_cases_template.toon")
     
     try:
-        with open(file_path, 'r') as f:
-            lines = f.readlines()
+        with open(file_path, 'rb') as f:
+            # Map the file instead of reading it: the regexes scan the page
+            # cache directly and only tc_id lines become Python objects.
+            if os.fstat(f.fileno()).st_size == 0:
+                blocks = []
+            else:
+                with mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ) as data:
+                    blocks = scan_toon_blocks(data)
     except FileNotFoundError:
         return json.dumps({"error": f"File not found: {file_path}"})
 
-    results = {}
-    
-    # helper to find test cases
-    # We look for lines like: "  tc_id: TC_XXX"
-    # We assume 'tc_id' is the start of the test case block.
-    
-    current_tc_id = None
-    current_start_line = -1
-    current_indent = -1
-    
-    # Regex to capture tc_id and its value. 
-    # Matches: "  tc_id: TC_001 " -> group(1) = "TC_001"
-    tc_pattern = re.compile(r'^\s*tc_id:\s*(.+)$')
-    
-    for i, line in enumerate(lines):
-        line_num = i + 1
-        stripped = line.strip()
-        
-        # Skip empty lines, but they are part of the previous block strictly speaking
-        if not stripped:
-            continue
-            
-        indent = get_indentation(line)
-        match = tc_pattern.match(line)
-        
-        if match:
-            # We found a new test case start
-            new_tc_id = match.group(1).strip()
-            
-            # If we were processing a test case, close it
-            if current_tc_id:
-                results[current_tc_id]["el"] = line_num - 1
-            
-            # Start new test case
-            current_tc_id = new_tc_id
-            current_start_line = line_num
-            current_indent = indent
-            
-            results[current_tc_id] = {
-                "sl": current_start_line,
-                "el": -1 # Placeholder
-            }
-            
+    # Write each entry straight into its JSON text (same layout as
+    # json.dumps(..., indent=2)) instead of building a dict of dicts first.
+    entries = []
+    positions = {}
+    for block in blocks:
+        entry = f'  {json.dumps(block["id"])}: {{\n    "sl": {block["sl"]},\n    "el": {block["el"]}\n  }}'
+        # A repeated tc_id keeps its first position but takes the later range
+        pos = positions.setdefault(block["id"], len(entries))
+        if pos == len(entries):
+            entries.append(entry)
         else:
-            # If we are inside a test case
-            if current_tc_id:
-                # If indentation drops below the start indentation, the block has ended
-                if indent < current_indent:
-                     # This check works because TOON/YAML hierarchy implies children are indented.
-                     # Siblings are at same indent. Parents are at lower indent.
-                     # If we see a line with lower indent (e.g. 'module: ...'), the previous TC block is done.
-                     results[current_tc_id]["el"] = line_num - 1
-                     current_tc_id = None
-                     current_start_line = -1
-                     current_indent = -1
-                
-                # If indentation is same, it's just another property of the current TC 
-                # OR it's a new TC (handled by the 'if match' block above).
-                # So we just continue.
-
-    # Close the last test case if file ended
-    if current_tc_id and results[current_tc_id]["el"] == -1:
-        results[current_tc_id]["el"] = len(lines)
-
-    return json.dumps(results, indent=2)
+            entries[pos] = entry
+
+    if not entries:
+        return "{}"
+    return "{\n" + ",\n".join(entries) + "\n}"
 
 if __name__ == "__main__":
     print(tool_list_test_cases())
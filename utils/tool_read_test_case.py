@@ -72,48 +72,40 @@ File Layout
 
 Dependencies
 ------------
-None beyond the Python standard library (``sys``, ``os``, ``re``).
+None beyond the Python standard library.  The block scanner is shared with
+``tool_list_test_cases`` so both tools agree on test-case boundaries.
 """
 
 import sys
 import os
-import re
+
+try:
+    from utils.tool_list_test_cases import scan_toon_blocks
+except ImportError:  # run as a script: utils/ itself is on sys.path
+    from tool_list_test_cases import scan_toon_blocks
 
 PROJECT_ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
 TOON_FILE = os.path.join(PROJECT_ROOT, "workspace", "intermediate", "test_cases_template.toon")
 
-def get_indentation(line):
-    """Return the number of leading whitespace characters in *line*.
-
-    This is used internally to detect indentation-based block boundaries
-    in the TOON file.  A decrease in indentation relative to the ``tc_id:``
-    line signals the end of that test-case block.
-
-    Args:
-        line (str): A single line of text (may include a trailing newline).
-
-    Returns:
-        int: Count of leading whitespace characters (spaces/tabs).
-
-    Example:
-        >>> get_indentation('    tc_id: TC_001')
-        4
-        >>> get_indentation('module: Login')
-        0
-    """
-    return len(line) - len(line.lstrip())
+# file_path -> ((st_mtime_ns, st_size, st_ino), tc_mapping, data, tc_by_id),
+# where tc_by_id maps each id to all of its blocks (ids may repeat).
+# Any write to the file (edit_tool replaces it with a new inode) changes the key.
+_PARSE_CACHE = {}
 
 def parse_toon_structure(file_path):
-    """Parse the TOON file and map every test-case ID to its line range.
+    """Parse the TOON file and map every test-case ID to its line and byte range.
 
-    Scans the file line-by-line looking for ``tc_id:`` entries.  For each
-    test case it records:
+    Scans the file for ``tc_id:`` entries (via ``scan_toon_blocks``, the
+    same scanner ``tool_list_test_cases`` uses).  For each test case it
+    records:
 
     - **id**     – The test-case identifier (e.g. ``TC_001``).
     - **sl**     – Start line number (1-based, inclusive).
     - **el**     – End line number (1-based, inclusive).
     - **indent** – Indentation level of the ``tc_id:`` line (used
                    internally to detect block boundaries).
+    - **start**, **end** – Byte range of the block in the file, so its
+                   text is ``data[start:end]``.
 
     Block boundaries are determined by indentation: when a non-empty line
     with *lower* indentation than the ``tc_id:`` line is encountered, the
@@ -125,73 +117,51 @@ def parse_toon_structure(file_path):
     Returns:
         tuple:
             - **tc_mapping** (list[dict]): Ordered list of dicts, each with
-              keys ``id`` (str), ``sl`` (int), ``el`` (int), ``indent`` (int).
-              Returns an empty list if the file is not found or contains
-              no ``tc_id`` entries.
-            - **lines** (list[str]): Raw lines of the file (each line
-              retains its trailing newline).  Useful for extracting the
-              actual content of a test case via slicing.
+              keys ``id`` (str), ``sl``, ``el``, ``indent``, ``start`` and
+              ``end`` (int).  Returns an empty list if the file is not found
+              or contains no ``tc_id`` entries.
+            - **data** (bytes): The raw file contents.  Slice it with a
+              block's ``start``/``end`` and decode only the test cases you
+              need; no per-line strings are ever built.
+
+    The result is cached per path and reused for as long as the file's
+    mtime, size and inode are unchanged, so repeated reads within an agent
+    session do not rescan the file.  Callers must not mutate it.
 
     Raises:
         Nothing – ``FileNotFoundError`` is caught internally and results
         in an empty list being returned.
 
     Example:
-        >>> mapping, lines = parse_toon_structure('workspace/intermediate/test_cases_template.toon')
+        >>> mapping, data = parse_toon_structure('workspace/intermediate/test_cases_template.toon')
         >>> mapping[0]
-        {'id': 'TC_001', 'sl': 3, 'el': 25, 'indent': 2}
+        {'id': 'TC_001', 'sl': 3, 'el': 25, 'indent': 2, 'start': 30, 'end': 746}
     """
+    tc_mapping, data, _ = _parse_toon(file_path)
+    return tc_mapping, data
+
+def _parse_toon(file_path):
+    """``parse_toon_structure`` plus a ``{tc_id: [blocks]}`` index (file order)."""
     try:
-        with open(file_path, 'r') as f:
-            lines = f.readlines()
+        with open(file_path, 'rb') as f:
+            st = os.fstat(f.fileno())
+            key = (st.st_mtime_ns, st.st_size, st.st_ino)
+            cached = _PARSE_CACHE.get(file_path)
+            if cached and cached[0] == key:
+                return cached[1:]
+            # Cached as bytes, not an mmap: a mapping kept alive would block
+            # edit_tool's os.replace on Windows, and a later in-place
+            # truncation would turn reads past the new EOF into SIGBUS.
+            data = f.read()
     except FileNotFoundError:
-        return [], []
+        return [], b"", {}
 
-    tc_mapping = []
-    
-    # Regex to capture tc_id and its value. 
-    tc_pattern = re.compile(r'^\s*tc_id:\s*(.+)$')
-    
-    current_tc = None
-    
-    for i, line in enumerate(lines):
-        line_num = i + 1
-        stripped = line.strip()
-        if not stripped:
-            continue
-            
-        indent = get_indentation(line)
-        match = tc_pattern.match(line)
-        
-        if match:
-            # Close previous if exists
-            if current_tc:
-                current_tc['el'] = line_num - 1
-                tc_mapping.append(current_tc)
-            
-            # Start new
-            current_tc = {
-                'id': match.group(1).strip(),
-                'sl': line_num,
-                'el': -1,
-                'indent': indent
-            }
-        
-        elif current_tc:
-            # Check for end of block by indentation
-            # If we see a line with equal or lower indentation than the start of the TC block,
-            # it means the block has ended (unless it's empty, checked above)
-            if indent < current_tc['indent']:
-                 current_tc['el'] = line_num - 1
-                 tc_mapping.append(current_tc)
-                 current_tc = None
-
-    # Handle last one
-    if current_tc:
-        current_tc['el'] = len(lines)
-        tc_mapping.append(current_tc)
-        
-    return tc_mapping, lines
+    tc_mapping = scan_toon_blocks(data)
+    tc_by_id = {}
+    for m in tc_mapping:
+        tc_by_id.setdefault(m['id'], []).append(m)
+    _PARSE_CACHE[file_path] = (key, tc_mapping, data, tc_by_id)
+    return tc_mapping, data, tc_by_id
 
 def tool_read_test_case(tc_ids=None, batch_index=0, batch_size=5):
     """Retrieve one or more test cases from the TOON file as raw text.
@@ -204,8 +174,8 @@ def tool_read_test_case(tc_ids=None, batch_index=0, batch_size=5):
 
     **Mode 1 – By ID (``tc_ids`` provided)**
         Supply specific test-case IDs and only those test cases are
-        returned.  Useful when the agent already knows which cases it
-        needs to re-read or retry.
+        returned, in the order requested.  Useful when the agent already
+        knows which cases it needs to re-read or retry.
 
         >>> tool_read_test_case(tc_ids='TC_001,TC_003')
         >>> tool_read_test_case(tc_ids=['TC_002'])
@@ -258,7 +228,16 @@ def tool_read_test_case(tc_ids=None, batch_index=0, batch_size=5):
           ``batch_index`` to use.  Keep calling until you see
           ``'# End of Test Cases.'``.
     """
-    mapping, lines = parse_toon_structure(TOON_FILE)
+    target_ids = None
+    if tc_ids:
+        if isinstance(tc_ids, str):
+            target_ids = [t.strip() for t in tc_ids.split(',')]
+        else:
+            target_ids = tc_ids
+
+    # By-ID reads scan the whole (cached) file too: a repeated tc_id may
+    # have blocks anywhere in it, and every one of them is returned
+    mapping, data, tc_by_id = _parse_toon(TOON_FILE)
     
     if not mapping:
         return f"Error: Could not parse {TOON_FILE}"
@@ -267,14 +246,10 @@ def tool_read_test_case(tc_ids=None, batch_index=0, batch_size=5):
 
     # Mode 1: Specific IDs
     if tc_ids:
-        if isinstance(tc_ids, str):
-            target_ids = [t.strip() for t in tc_ids.split(',')]
-        else:
-            target_ids = tc_ids
-            
-        for m in mapping:
-            if m['id'] in target_ids:
-                selected_tcs.append(m)
+        # Dict lookups, in the order the ids were requested (repeats dropped);
+        # an id with several blocks contributes all of them, in file order
+        for t in dict.fromkeys(target_ids):
+            selected_tcs.extend(tc_by_id.get(t, ()))
     
     # Mode 2: Batching
     else:
@@ -304,8 +279,12 @@ def tool_read_test_case(tc_ids=None, batch_index=0, batch_size=5):
 
     output = [param_info]
     for tc in selected_tcs:
-        # Extract lines. converting 1-based line nums to 0-based list indices
-        chunk = "".join(lines[tc['sl']-1 : tc['el']])
+        # Decode just this block's bytes
+        chunk = data[tc['start']:tc['end']].decode('utf-8')
+        if "\r" in chunk:
+            # Same newline translation a text-mode read (and edit_file's
+            # search) applies, so the output can be copied into old_string
+            chunk = chunk.replace("\r\n", "\n").replace("\r", "\n")
         output.append(chunk)
 
     return "\n".join(output)
@@ -365,7 +344,8 @@ if __name__ == "__main__":
         # Automatic mode: Use state file
         current_idx = load_state()
         
-        # Check total batches to see if we should reset or proceed
+        # Check total batches to see if we should reset or proceed.  This
+        # parse is cached, so tool_read_test_case below does not rescan.
         mapping, _ = parse_toon_structure(TOON_FILE)
         batch_size = 5
         total_batches = (len(mapping) + batch_size - 1) // batch_size
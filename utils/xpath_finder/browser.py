@@ -5,30 +5,160 @@ import re
 import time
 import hashlib
 import asyncio
+import itertools
+import subprocess
+from collections import OrderedDict
 
-from playwright.async_api import async_playwright, Page
+from playwright.async_api import async_playwright, Page, Error as PlaywrightError
+
+try:
+    import zstandard
+except ImportError:
+    zstandard = None
 
 _CACHE_DIR = ".dom_cache"
+_CACHE_TTL = 3600  # seconds a cached page (in memory or on disk) stays fresh
+_PAGE_CACHE_MAX = 16  # open pages kept; the least recently used is closed
+# HTML compresses ~10x, so with zstandard installed the DOM cache is stored
+# compressed; fewer bytes to read back on every cache hit.
+if zstandard:
+    _CACHE_EXT = ".html.zst"
+    _ZSTD_C = zstandard.ZstdCompressor(level=3)
+    _ZSTD_D = zstandard.ZstdDecompressor()
+else:
+    _CACHE_EXT = ".html"
+# Opt-in: keep one headless Chromium running between processes and attach to
+# it over CDP, so repeated CLI/agent runs skip the browser cold start. The
+# browser outlives the process; kill the Chromium process to reset it.
+PERSIST_BROWSER = os.environ.get("XPATH_FINDER_PERSIST_BROWSER", "") == "1"
+_CDP_ENDPOINT_FILE = os.path.join(_CACHE_DIR, ".cdp_endpoint")
+_CDP_PROFILE_DIR = os.path.join(_CACHE_DIR, "chromium-profile")
 _browser = None
+_context = None
 _playwright = None
-_page_cache = {}
+_page_cache = OrderedDict()
+_in_flight = {}  # url -> Future of a page still being loaded
+_launch_lock = asyncio.Lock()
+
+# Compiled once at import rather than looked up per get_page call
+_WWW_RE = re.compile(r"(https?://)www\.")
+_SCRIPT_RE = re.compile(rb"<script\b[^>]*>[\s\S]*?</script>", re.I)
 
 
 async def _get_browser():
     """Get or create a headless Chromium browser."""
     global _browser, _playwright
-    if _browser is None:
-        _playwright = await async_playwright().start()
-        _browser = await _playwright.chromium.launch(headless=True)
+    # Concurrent callers must not launch a second browser
+    async with _launch_lock:
+        if _browser is None:
+            _playwright = await async_playwright().start()
+            if PERSIST_BROWSER:
+                _browser = await _connect_persistent_browser(_playwright)
+            else:
+                _browser = await _playwright.chromium.launch(headless=True)
     return _browser
 
 
+async def _connect_persistent_browser(playwright):
+    """Attach to the shared Chromium over CDP, starting it if none is running."""
+    profile = os.path.abspath(_CDP_PROFILE_DIR)
+    port_file = os.path.join(profile, "DevToolsActivePort")
+
+    # The saved endpoint, else the port a Chromium still running on the
+    # profile reported: a second launch on a locked profile would only hand
+    # off to that instance and exit without reporting a port
+    try:
+        with open(_CDP_ENDPOINT_FILE) as f:
+            return await playwright.chromium.connect_over_cdp(f.read().strip())
+    except (PlaywrightError, OSError):
+        pass  # no saved endpoint, or that browser is gone
+    try:
+        with open(port_file) as f:
+            endpoint = f"http://127.0.0.1:{f.readline().strip()}"
+        browser = await playwright.chromium.connect_over_cdp(endpoint)
+    except (PlaywrightError, OSError):
+        pass  # no browser left on the profile
+    else:
+        _save_endpoint(endpoint)
+        return browser
+
+    os.makedirs(profile, exist_ok=True)
+    try:
+        os.remove(port_file)
+    except FileNotFoundError:
+        pass
+    # Started outside Playwright's driver so it survives this process
+    proc = subprocess.Popen(
+        [playwright.chromium.executable_path, "--headless=new", "--no-first-run",
+         "--remote-debugging-port=0", f"--user-data-dir={profile}", "about:blank"],
+        stdout=subprocess.DEVNULL, stderr=subprocess.DEVNULL, start_new_session=True,
+    )
+    # Chromium writes the port it picked to DevToolsActivePort once listening
+    port = ""
+    for _ in range(100):
+        try:
+            with open(port_file) as f:
+                port = f.readline().strip()
+        except FileNotFoundError:
+            pass
+        if port:
+            break
+        if proc.poll() is not None:
+            raise RuntimeError(
+                f"Chromium exited before reporting a DevTools port; if another "
+                f"Chromium is using {profile}, kill it and retry"
+            )
+        await asyncio.sleep(0.1)
+    else:
+        raise RuntimeError("Chromium did not report a DevTools port")
+
+    endpoint = f"http://127.0.0.1:{port}"
+    _save_endpoint(endpoint)
+    return await playwright.chromium.connect_over_cdp(endpoint)
+
+
+def _save_endpoint(endpoint: str):
+    """Remember the shared Chromium's CDP endpoint for later processes."""
+    with open(_CDP_ENDPOINT_FILE, "w") as f:
+        f.write(endpoint)
+
+
+async def _get_context():
+    """Get or create the browser context shared by all cached pages."""
+    global _context
+    browser = await _get_browser()
+    async with _launch_lock:
+        if _context is None:
+            _context = await browser.new_context()
+    return _context
+
+
+async def close_browser():
+    """Close all cached pages, the shared context and the browser.
+
+    With PERSIST_BROWSER this only disconnects; the shared Chromium keeps
+    running for the next process.
+    """
+    global _browser, _context, _playwright
+    _page_cache.clear()
+    if _context is not None:
+        await _context.close()
+        _context = None
+    if _browser is not None:
+        await _browser.close()
+        _browser = None
+    if _playwright is not None:
+        await _playwright.stop()
+        _playwright = None
+
+
 async def get_page(url: str) -> Page:
     """Get a Playwright page for the URL, using disk caching.
 
     This function manages a singleton browser instance and implements disk-based
     caching for HTML content. It prevents redundant network requests for the same
-    URL within a 1-hour window.
+    URL within a 1-hour window. At most _PAGE_CACHE_MAX pages are kept open; the
+    least recently used one is closed when that is exceeded.
 
     Args:
         url: The full URL to load.
@@ -41,38 +171,67 @@ async def get_page(url: str) -> Page:
         url = "https://" + url
 
     # Strip www. from the URL if present (e.g. https://www.dev.erosnow.com -> https://dev.erosnow.com)
-    url = re.sub(r"(https?://)www\.", r"\1", url)
+    url = _WWW_RE.sub(r"\1", url)
 
-    if url in _page_cache:
-        return _page_cache[url]["page"]
-    
-    browser = await _get_browser()
-    context = await browser.new_context()
+    entry = _page_cache.get(url)
+    if entry is not None:
+        if time.time() - entry["loaded_at"] < _CACHE_TTL:
+            _page_cache.move_to_end(url)
+            return entry["page"]
+        # Stale: drop it and load afresh, as the disk cache would
+        del _page_cache[url]
+        await _close_page(entry["page"])
+
+    # Concurrent callers for the same URL share one load instead of each
+    # opening a page and hitting the network. shield() keeps a cancelled
+    # waiter from cancelling the load for everyone else.
+    pending = _in_flight.get(url)
+    if pending is not None:
+        return await asyncio.shield(pending)
+
+    future = asyncio.get_running_loop().create_future()
+    _in_flight[url] = future
+    try:
+        page = await _load_page(url)
+    except asyncio.CancelledError:
+        future.cancel()
+        raise
+    except Exception as e:
+        future.set_exception(e)
+        future.exception()  # mark retrieved: there may be no other waiters
+        raise
+    else:
+        future.set_result(page)
+    finally:
+        del _in_flight[url]
+    return page
+
+
+async def _load_page(url: str) -> Page:
+    """Open a page for *url* from the disk cache or the network and cache it."""
+    context = await _get_context()
     page = await context.new_page()
     
     # Check disk cache
-    cache_path = os.path.join(_CACHE_DIR, f"{hashlib.md5(url.encode()).hexdigest()}.html")
+    cache_path = os.path.join(_CACHE_DIR, f"{hashlib.blake2b(url.encode(), digest_size=16).hexdigest()}{_CACHE_EXT}")
     cached_html = None
     
-    if os.path.exists(cache_path) and time.time() - os.path.getmtime(cache_path) < 3600:
-        with open(cache_path, "r", encoding="utf-8") as f:
-            cached_html = f.read()
+    if os.path.exists(cache_path) and time.time() - os.path.getmtime(cache_path) < _CACHE_TTL:
+        cached_html = _read_cache(cache_path)
     
     if cached_html:
-        # Inject base tag, strip scripts to freeze DOM
-        if "<base" not in cached_html[:1000].lower():
-            cached_html = cached_html.replace("<head>", f'<head><base href="{url}">', 1)
-        cached_html = re.sub(r"<script\b[^>]*>[\s\S]*?</script>", "", cached_html, flags=re.I)
-        await page.set_content(cached_html, wait_until="domcontentloaded")
+        await page.set_content(_freeze_html(cached_html, url), wait_until="domcontentloaded")
     else:
         try:
             await page.goto(url, wait_until="domcontentloaded", timeout=60000)
             await page.wait_for_timeout(2000)
-            await _scroll_to_load(page)
+            # Scrolling costs 300ms per viewport; only pay it when the page
+            # shows signs of lazy-loaded content
+            if await page.evaluate(_HAS_LAZY_JS):
+                await _scroll_to_load(page)
             os.makedirs(_CACHE_DIR, exist_ok=True)
             content = await page.content()
-            with open(cache_path, "w", encoding="utf-8") as f:
-                f.write(content)
+            _write_cache(cache_path, content)
         except Exception as e:
             # If navigation fails, we still return the page, though it might be empty or error state
             # but usually we'd want to raise or handle it. For now, let's just log print
@@ -80,24 +239,92 @@ async def get_page(url: str) -> Page:
             pass
 
     
-    _page_cache[url] = {"page": page, "context": context}
+    _page_cache[url] = {"page": page, "loaded_at": time.time()}
+    while len(_page_cache) > _PAGE_CACHE_MAX:
+        _, evicted = _page_cache.popitem(last=False)
+        await _close_page(evicted["page"])
     return page
 
 
+def _read_cache(path: str) -> bytes:
+    """Read a DOM cache file written by _write_cache, as UTF-8 bytes."""
+    with open(path, "rb") as f:
+        data = f.read()
+    if zstandard:
+        data = _ZSTD_D.decompress(data)
+    return data
+
+
+def _write_cache(path: str, html: str):
+    """Write *html* to the DOM cache, zstd-compressed when available."""
+    data = html.encode("utf-8")
+    if zstandard:
+        data = _ZSTD_C.compress(data)
+    with open(path, "wb") as f:
+        f.write(data)
+
+
+def _freeze_html(html: bytes, url: str) -> str:
+    """Inject a <base> tag and strip scripts to freeze a cached DOM.
+
+    One pass over the script matches collects the kept slices, and the base
+    tag goes in after the first <head> outside a script; the result is
+    joined once instead of building a full copy per edit.  Works on the
+    cached UTF-8 bytes and decodes only the final document.
+    """
+    base = f'<head><base href="{url}">'.encode() if b"<base" not in html[:1000].lower() else None
+    parts = []
+    pos = 0
+    for m in itertools.chain(_SCRIPT_RE.finditer(html), (None,)):
+        end = m.start() if m else len(html)
+        if base:
+            head = html.find(b"<head>", pos, end)
+            if head != -1:
+                parts.append(html[pos:head])
+                parts.append(base)
+                pos = head + len(b"<head>")
+                base = None
+        parts.append(html[pos:end])
+        if m:
+            pos = m.end()
+    return b"".join(parts).decode("utf-8")
+
+
+async def _close_page(page: Page):
+    """Close a page dropped from the cache; it may already be gone."""
+    try:
+        await page.close()
+    except Exception:
+        pass
+
+
+_HAS_LAZY_JS = """
+() => !!document.querySelector('[loading="lazy"], [data-src], [data-srcset], [data-lazy]')
+"""
+
+# Scrolls one viewport at a time, pausing for lazy content and following the
+# page as it grows, then returns to the top -- all in a single evaluate call.
+_SCROLL_JS = """
+async () => {
+    const sleep = ms => new Promise(r => setTimeout(r, ms));
+    const viewport = window.innerHeight;
+    let height = document.body.scrollHeight;
+    let pos = 0;
+    while (pos < height) {
+        pos += viewport;
+        window.scrollTo(0, pos);
+        await sleep(300);
+        height = Math.max(height, document.body.scrollHeight);
+    }
+    window.scrollTo(0, 0);
+}
+"""
+
+
 async def _scroll_to_load(page: Page):
     """Scroll page to trigger lazy-loaded content."""
     try:
-        height = await page.evaluate("document.body.scrollHeight")
-        viewport = await page.evaluate("window.innerHeight")
-        pos = 0
-        while pos < height:
-            pos += viewport
-            await page.evaluate(f"window.scrollTo(0, {pos})")
-            await page.wait_for_timeout(300)
-            new_height = await page.evaluate("document.body.scrollHeight")
-            if new_height > height:
-                height = new_height
-        await page.evaluate("window.scrollTo(0, 0)")
+        await page.evaluate(_SCROLL_JS)
         await page.wait_for_load_state("networkidle", timeout=5000)
-    except:
+    except PlaywrightError:
         await page.wait_for_timeout(1000)
@@ -1,9 +1,36 @@
 """Text normalization and fuzzy matching utilities."""
 
 import re
-from difflib import SequenceMatcher
+from functools import lru_cache
 
+try:
+    from rapidfuzz import fuzz, process
+except ImportError:
+    fuzz = None
+    process = None
 
+# process.cdist returns a numpy array, and rapidfuzz does not depend on numpy;
+# without it the batch scorers fall back to per-pair fuzz.ratio calls
+try:
+    import numpy
+except ImportError:
+    numpy = None
+
+
+# Precompiled patterns for the normalization hot path
+_QUOTES_RE = re.compile(r"['\"`\u2018\u2019\u201c\u201d]")
+_PUNCT_RE = re.compile(r"[^\w\s]")
+_WS_RE = re.compile(r"\s+")
+
+# Deletion table for normalize_id: separators, quotes and every character
+# matched by \s (all Unicode whitespace lies at or below U+3000)
+_ID_STRIP_TABLE = str.maketrans("", "", "".join(
+    [chr(c) for c in range(0x3001) if chr(c).isspace()]
+    + ["-", "_", "'", '"', "`", "\u2018", "\u2019", "\u201c", "\u201d"]
+))
+
+
+@lru_cache(maxsize=4096)
 def normalize(text: str) -> str:
     """
     Normalize text for fuzzy comparison:
@@ -14,15 +41,12 @@ def normalize(text: str) -> str:
     """
     if not text:
         return ""
-    normalized = text.lower()
-    # Remove quotes and apostrophes (including smart quotes)
-    normalized = re.sub(r"['\"`\u2018\u2019\u201c\u201d]", "", normalized)
-    # Remove other punctuation but keep spaces
-    normalized = re.sub(r"[^\w\s]", " ", normalized)
-    # Collapse whitespace
-    return re.sub(r"\s+", " ", normalized).strip()
+    # Remove quotes and apostrophes (including smart quotes), then other
+    # punctuation (keeping spaces), then collapse whitespace
+    return _WS_RE.sub(" ", _PUNCT_RE.sub(" ", _QUOTES_RE.sub("", text.lower()))).strip()
 
 
+@lru_cache(maxsize=4096)
 def normalize_id(text: str) -> str:
     """
     Normalize for ID/class matching:
@@ -31,18 +55,128 @@ def normalize_id(text: str) -> str:
     """
     if not text:
         return ""
-    return re.sub(r"[\s\-_'\"`\u2018\u2019\u201c\u201d]", "", text.lower())
+    return text.lower().translate(_ID_STRIP_TABLE)
+
+
+def _lcs_length(a: str, b: str, at_least: float = 0) -> int:
+    """Length of the longest common subsequence of *a* and *b*.
+
+    Bit-parallel (Allison-Dix / Hyyro): each row of the DP table is packed
+    into one Python int with a bit per character of the longer string, so
+    the work is one short run of integer ops per character of the shorter
+    string instead of a cell-by-cell table.
+
+    If *at_least* is given, the scan stops as soon as the LCS can no longer
+    reach it (each remaining character adds at most one) and returns that
+    upper bound, which is below *at_least*.
+    """
+    if len(a) > len(b):
+        a, b = b, a
+    masks = {}
+    for i, ch in enumerate(b):
+        masks[ch] = masks.get(ch, 0) | (1 << i)
+    full = (1 << len(b)) - 1
+    row = full
+    remaining = len(a)
+    for ch in a:
+        matched = row & masks.get(ch, 0)
+        row = ((row + matched) | (row - matched)) & full
+        remaining -= 1
+        if at_least:
+            bound = len(b) - row.bit_count() + remaining
+            if bound < at_least:
+                return bound
+    # Each cleared bit is one more character of the subsequence
+    return len(b) - row.bit_count()
+
+
+def _ratio(a: str, b: str, min_score: float = 0.0) -> float:
+    """Similarity ratio (0.0 to 1.0), using RapidFuzz when it is installed.
+
+    Without RapidFuzz the same score, 2 * LCS / (len(a) + len(b)) (the
+    normalized Indel similarity behind ``fuzz.ratio``), is computed by
+    ``_lcs_length``.
+
+    Scores below *min_score* are returned as 0.0.  Both scorers compute
+    2*M / (len(a) + len(b)) with M <= min(len(a), len(b)), so a pair whose
+    lengths alone cap the ratio below *min_score* is rejected unscored.
+    """
+    total = len(a) + len(b)
+    if min_score and total and 2 * min(len(a), len(b)) < min_score * total:
+        return 0.0
+    if fuzz is not None:
+        return fuzz.ratio(a, b, score_cutoff=min_score * 100) / 100.0
+    if not total:
+        return 1.0
+    # The ratio reaches min_score only if the LCS reaches min_score * total / 2
+    sim = 2 * _lcs_length(a, b, min_score * total / 2) / total
+    return sim if sim >= min_score else 0.0
 
 
-def similarity(text1: str, text2: str) -> float:
+@lru_cache(maxsize=8192)
+def similarity(text1: str, text2: str, min_score: float = 0.0) -> float:
     """Calculate similarity ratio between two normalized strings (0.0 to 1.0)."""
     if not text1 or not text2:
         return 0.0
-    return SequenceMatcher(None, normalize(text1), normalize(text2)).ratio()
+    return _ratio(normalize(text1), normalize(text2), min_score)
 
 
-def id_similarity(text1: str, text2: str) -> float:
+@lru_cache(maxsize=8192)
+def id_similarity(text1: str, text2: str, min_score: float = 0.0) -> float:
     """Calculate similarity for ID/class matching."""
     if not text1 or not text2:
         return 0.0
-    return SequenceMatcher(None, normalize_id(text1), normalize_id(text2)).ratio()
+    return _ratio(normalize_id(text1), normalize_id(text2), min_score)
+
+
+def similarity_batch(hint: str, candidates: list[str], min_score: float = 0.0) -> list[float]:
+    """Score *hint* against every candidate text in one call.
+
+    Equivalent to ``[similarity(hint, c) for c in candidates]``, but with
+    RapidFuzz and numpy installed the whole row is scored by ``process.cdist`` in C.
+    Scores below *min_score* are reported as 0.0.
+    """
+    return score_matrix([hint], candidates, min_score)[0]
+
+
+def id_similarity_batch(hint: str, candidates: list[str], min_score: float = 0.0) -> list[float]:
+    """Score *hint* against every candidate ID/class value in one call.
+
+    Equivalent to ``[id_similarity(hint, c) for c in candidates]``, with the
+    hint normalized once.  Scores below *min_score* are reported as 0.0.
+    """
+    return _score_matrix([hint], candidates, min_score, normalize_id)[0]
+
+
+def score_matrix(hints: list[str], candidates: list[str], min_score: float = 0.0) -> list[list[float]]:
+    """Score every hint against every candidate text (0.0 to 1.0).
+
+    Returns an ``len(hints) x len(candidates)`` matrix where
+    ``matrix[i][j] == similarity(hints[i], candidates[j])``.  With RapidFuzz
+    and numpy installed the whole matrix is computed by one multi-threaded ``cdist`` call.
+    Scores below *min_score* are reported as 0.0; RapidFuzz uses it as a
+    cutoff and abandons those pairs early.
+    """
+    return _score_matrix(hints, candidates, min_score, normalize)
+
+
+def _score_matrix(hints, candidates, min_score, norm):
+    """score_matrix with *norm* as the normalizer; each string is normalized once."""
+    norm_hints = [norm(h or "") for h in hints]
+    norm_candidates = [norm(c or "") for c in candidates]
+    if process is None or numpy is None:
+        rows = [[_ratio(h, c, min_score) for c in norm_candidates] for h in norm_hints]
+    else:
+        scores = process.cdist(
+            norm_hints,
+            norm_candidates,
+            scorer=fuzz.ratio,
+            score_cutoff=min_score * 100,
+            workers=-1,
+        )
+        rows = [[s / 100.0 for s in row] for row in scores.tolist()]
+    # Empty inputs score 0.0, matching similarity()
+    return [
+        [s if h and c else 0.0 for s, c in zip(row, candidates)]
+        for h, row in zip(hints, rows)
+    ]
@@ -6,31 +6,49 @@ Matches the output quality of the original find_xpath.py.
 """
 
 import re
+import heapq
+import asyncio
+from functools import lru_cache
+from playwright.async_api import Error as PlaywrightError
 from .browser import get_page
-from .xpath import get_element_info
-from .matching import similarity, id_similarity
+from .xpath import get_element_info, harvest_dom, get_harvested_info
+from .matching import similarity, similarity_batch, id_similarity_batch
 
 
 # Attributes to check for matching (same as original)
 MATCHABLE_ATTRIBUTES = ['id', 'name', 'class', 'data-testid', 'aria-label', 
                         'placeholder', 'title', 'value', 'alt']
 
+# Elements scored by fuzzy text matching when no element type is given, in
+# order of preference: interactive elements first, so page-wide containers
+# do not use up the text budget before the controls are reached
+FUZZY_TEXT_SELECTORS = ["button, a, input, label", "h1, h2, h3, p, li, span, div"]
 
-def _parse_hint(hint: str) -> str:
-    """
-    Extract the search text from a hint string.
-    Handles formats like: "text='Login'", "label='Email'", or just "Login"
-    """
-    patterns = [
+# A native locator matching more elements than this says nothing about which
+# one is meant; it is dropped rather than ranked with a penalty
+MAX_LOCATOR_MATCHES = 50
+
+# Hint formats recognised by _parse_hint, tried in order
+_HINT_PATTERNS = [
+    re.compile(pattern, re.IGNORECASE)
+    for pattern in (
         r"text=['\"]([^'\"]+)['\"]",
         r"label=['\"]([^'\"]+)['\"]",
         r"placeholder=['\"]([^'\"]+)['\"]",
         r"aria-label=['\"]([^'\"]+)['\"]",
         r"^['\"]([^'\"]+)['\"]$",
-    ]
-    
-    for pattern in patterns:
-        match = re.search(pattern, hint, re.IGNORECASE)
+    )
+]
+
+
+@lru_cache(maxsize=1024)
+def _parse_hint(hint: str) -> str:
+    """
+    Extract the search text from a hint string.
+    Handles formats like: "text='Login'", "label='Email'", or just "Login"
+    """
+    for pattern in _HINT_PATTERNS:
+        match = pattern.search(hint)
         if match:
             return match.group(1)
     
@@ -72,27 +90,14 @@ async def find_xpath(url: str, hint: str, element_type: str = "*", top_n: int =
         ]
     """
     page = await get_page(url)
-    search_text = _parse_hint(hint)
-    candidates = []
-    
-    # Strategy 1: Playwright native locators
-    await _find_via_playwright(page, search_text, element_type, candidates)
-    
-    # Strategy 2: Fuzzy text matching
-    await _find_via_fuzzy_text(page, search_text, element_type, candidates)
-    
-    # Strategy 3: Attribute matching
-    await _find_via_attributes(page, search_text, element_type, candidates)
-    
-    # Deduplicate, sort, return top N
-    return _rank_candidates(candidates, top_n)
+    return await _find_on_page(page, hint, element_type, top_n)
 
 
 async def find_multiple_xpath(url: str, hints: list[str], top_n: int = 3) -> dict[str, list[dict]]:
     """Find XPath locators for multiple elements on the same page efficiently.
 
     This tool is optimized for batch processing. It loads the webpage once and then
-    performs element discovery for each hint in the provided list.
+    performs element discovery for all hints concurrently on that shared page.
 
     Args:
         url: The full URL of the webpage to search.
@@ -111,141 +116,208 @@ async def find_multiple_xpath(url: str, hints: list[str], top_n: int = 3) -> dic
         }
     """
     page = await get_page(url)
-    results = {}
     
-    for hint in hints:
-        search_text = _parse_hint(hint)
-        candidates = []
-        
-        await _find_via_playwright(page, search_text, "*", candidates)
-        await _find_via_fuzzy_text(page, search_text, "*", candidates)
-        await _find_via_attributes(page, search_text, "*", candidates)
-        
-        results[hint] = _rank_candidates(candidates, top_n)
-        
+    # One DOM snapshot serves every hint; only the Playwright-native
+    # strategy still queries the live page per hint
+    snapshot = await _harvest(page, "*")
+    try:
+        # All lookups are read-only, so they can share the page concurrently
+        tasks = [_find_on_page(page, hint, "*", top_n, snapshot) for hint in hints]
+        outcomes = await asyncio.gather(*tasks, return_exceptions=True)
+    finally:
+        if snapshot is not None:
+            await snapshot["handle"].dispose()
+    
+    results = {}
+    for hint, outcome in zip(hints, outcomes):
+        if isinstance(outcome, Exception):
+            # One failing hint must not sink the batch, but say why it is empty
+            print(f"Error finding xpath for {hint!r}: {outcome!r}")
+            outcome = []
+        results[hint] = outcome
     return results
 
 
-async def _find_via_playwright(page, search_text: str, element_type: str, candidates: list):
+async def _find_on_page(page, hint: str, element_type: str, top_n: int, snapshot=None) -> list[dict]:
+    """Run all matching strategies for one hint against an already-loaded page.
+
+    *snapshot* is a ``_harvest(page, element_type)`` result shared by the
+    caller; without one, the page is harvested (and released) here.
+    """
+    search_text = _parse_hint(hint)
+    candidates = {}  # (xpath, tag) -> best candidate so far
+    
+    # Strategy 1: Playwright native locators. Strategies 2 and 3 score one
+    # DOM snapshot instead of querying the browser element by element;
+    # unless the caller shares one, it is taken while strategy 1 runs.
+    owned = snapshot is None
+    if owned:
+        _, snapshot = await asyncio.gather(
+            _find_via_playwright(page, search_text, element_type, candidates),
+            _harvest(page, element_type),
+        )
+    else:
+        await _find_via_playwright(page, search_text, element_type, candidates)
+    if snapshot is not None:
+        try:
+            # Scoring is pure CPU work; off the event loop, the lookups for
+            # several hints score in parallel (RapidFuzz releases the GIL)
+            matches = await asyncio.to_thread(_score_snapshot, snapshot, search_text)
+            await _add_snapshot_candidates(snapshot, matches, candidates)
+        finally:
+            if owned:
+                await snapshot["handle"].dispose()
+    
+    # Rank and return top N
+    return _rank_candidates(candidates, top_n)
+
+
+@lru_cache(maxsize=1024)
+def _text_regex(search_text: str):
+    """Case-insensitive regex matching *search_text* literally anywhere."""
+    return re.compile(re.escape(search_text), re.I)
+
+
+async def _find_via_playwright(page, search_text: str, element_type: str, candidates: dict):
     """Strategy 1: Use Playwright's built-in locators."""
+    needle = _text_regex(search_text)
     
     locator_attempts = [
         # Exact text match (case-insensitive)
         (lambda: page.get_by_text(search_text, exact=False), 0.95, "playwright_text"),
         # Label
-        (lambda: page.get_by_label(re.compile(search_text, re.I)), 0.88, "playwright_label"),
+        (lambda: page.get_by_label(needle), 0.88, "playwright_label"),
         # Placeholder
-        (lambda: page.get_by_placeholder(re.compile(search_text, re.I)), 0.85, "playwright_placeholder"),
+        (lambda: page.get_by_placeholder(needle), 0.85, "playwright_placeholder"),
     ]
     
     # Add role-based locator if element_type is specified
     if element_type != "*":
         locator_attempts.insert(1, (
-            lambda: page.get_by_role(element_type, name=re.compile(search_text, re.I)),
+            lambda: page.get_by_role(element_type, name=needle),
             0.90,
             "playwright_role"
         ))
     
-    for locator_fn, base_confidence, strategy in locator_attempts:
-        try:
-            locator = locator_fn()
-            count = await locator.count()
-            if count > 0:
-                info = await get_element_info(page, locator.first)
-                
-                # Adjust confidence based on match quality
-                if info.get("text"):
-                    sim = similarity(search_text, info["text"])
-                    confidence = base_confidence * (0.5 + 0.5 * sim)
-                else:
-                    confidence = base_confidence * 0.8
-                
-                # Penalize if multiple matches
-                if count > 1:
-                    confidence *= 0.85
-                
-                candidates.append({
-                    **info,
-                    "confidence": round(confidence, 3),
-                    "strategy": strategy
-                })
-        except:
-            pass
-
-
-async def _find_via_fuzzy_text(page, search_text: str, element_type: str, candidates: list):
-    """Strategy 2: Fuzzy text matching using difflib."""
-    selector = element_type if element_type != "*" else "button, a, input, label, span, div, h1, h2, h3, p, li"
-    
+    # The attempts are independent read-only queries: run them all at once
+    # so the strategy costs one round of browser calls, not one per locator
+    found = await asyncio.gather(*(
+        _try_locator(page, locator_fn, base_confidence, strategy, search_text)
+        for locator_fn, base_confidence, strategy in locator_attempts
+    ))
+    for match in found:
+        if match is not None:
+            _add_candidate(candidates, *match)
+
+
+async def _try_locator(page, locator_fn, base_confidence: float, strategy: str, search_text: str):
+    """Score a locator's first match as (info, confidence, strategy).
+
+    Returns None if the locator matches nothing, or too many elements to be
+    informative.
+    """
     try:
-        elements = await page.locator(selector).all()
-        for el in elements[:100]:  # Limit to prevent slowdown
-            try:
-                text = await el.inner_text(timeout=1000)
-                if not text or len(text) > 200:
-                    continue
-                
-                sim = similarity(search_text, text)
-                
-                if sim >= 0.5:
-                    info = await get_element_info(page, el)
-                    # Maps 0.5-1.0 to 0.6-1.0
-                    confidence = 0.6 + (sim - 0.5) * 0.8
-                    
-                    candidates.append({
-                        **info,
-                        "confidence": round(confidence, 3),
-                        "strategy": "fuzzy_text_match"
-                    })
-            except:
-                pass
-    except:
-        pass
-
-
-async def _find_via_attributes(page, search_text: str, element_type: str, candidates: list):
-    """Strategy 3: Match against element attributes (id, name, class, etc.)."""
-    tag = element_type if element_type != "*" else "*"
+        locator = locator_fn()
+        count = await locator.count()
+    except PlaywrightError:
+        # e.g. an element_type that is not a valid ARIA role
+        return None
+    if count == 0 or count > MAX_LOCATOR_MATCHES:
+        return None
+    info = await get_element_info(page, locator.first)
     
-    for attr in MATCHABLE_ATTRIBUTES:
-        try:
-            elements = await page.locator(f"{tag}[{attr}]").all()
-            for el in elements[:50]:
-                try:
-                    attr_value = await el.get_attribute(attr, timeout=1000)
-                    if not attr_value:
-                        continue
-                    
-                    # Calculate ID-style similarity
-                    sim = id_similarity(search_text, attr_value)
-                    
-                    if sim >= 0.6:
-                        info = await get_element_info(page, el)
-                        
-                        # Confidence based on attribute type and similarity
-                        base_conf = 0.85 if attr in ['id', 'data-testid'] else 0.75
-                        confidence = base_conf * sim
-                        
-                        candidates.append({
-                            **info,
-                            "confidence": round(confidence, 3),
-                            "strategy": f"attribute_match_{attr}"
-                        })
-                except:
-                    pass
-        except:
-            pass
-
-
-def _rank_candidates(candidates: list, top_n: int) -> list:
-    """Deduplicate by xpath, sort by confidence, add rank."""
-    seen = {}
-    for c in candidates:
-        key = (c.get("xpath", ""), c.get("tag", ""))
-        if key[0] and (key not in seen or seen[key]["confidence"] < c["confidence"]):
-            seen[key] = c
+    # Adjust confidence based on match quality
+    if info.get("text"):
+        sim = similarity(search_text, info["text"])
+        confidence = base_confidence * (0.5 + 0.5 * sim)
+    else:
+        confidence = base_confidence * 0.8
+    
+    # Penalize if multiple matches
+    if count > 1:
+        confidence *= 0.85
     
-    result = sorted(seen.values(), key=lambda x: x["confidence"], reverse=True)[:top_n]
+    return info, confidence, strategy
+
+
+async def _harvest(page, element_type: str):
+    """Snapshot the texts and attribute values strategies 2 and 3 score, or None."""
+    selectors = [element_type] if element_type != "*" else FUZZY_TEXT_SELECTORS
+    try:
+        return await harvest_dom(page, selectors, element_type, MATCHABLE_ATTRIBUTES,
+                                 text_limit=100, attr_limit=50)
+    except PlaywrightError:
+        return None
+
+
+def _score_snapshot(snapshot: dict, search_text: str) -> list:
+    """Run strategies 2 and 3 over a snapshot; returns their matches in order."""
+    # Strategy 2: Fuzzy text matching
+    matches = _find_via_fuzzy_text(snapshot, search_text)
+    # Strategy 3: Attribute matching
+    matches += _find_via_attributes(snapshot, search_text)
+    return matches
+
+
+def _find_via_fuzzy_text(snapshot: dict, search_text: str) -> list:
+    """Strategy 2: Fuzzy text matching.
+
+    Returns (node index, confidence, strategy) tuples.
+    """
+    texts = snapshot["texts"]
+    # Score the whole text column against the hint in one call
+    sims = similarity_batch(search_text, texts["values"], min_score=0.5)
+    return [
+        # Maps 0.5-1.0 to 0.6-1.0
+        (index, 0.6 + (sim - 0.5) * 0.8, "fuzzy_text_match")
+        for index, sim in zip(texts["nodes"], sims)
+        if sim >= 0.5
+    ]
+
+
+def _find_via_attributes(snapshot: dict, search_text: str) -> list:
+    """Strategy 3: Match against element attributes (id, name, class, etc.).
+
+    Returns (node index, confidence, strategy) tuples.
+    """
+    attrs = snapshot["attrs"]
+    # Calculate ID-style similarity for the whole value column in one call,
+    # which normalizes the search text once
+    sims = id_similarity_batch(search_text, attrs["values"], min_score=0.6)
+    matches = []
+    for index, attr, sim in zip(attrs["nodes"], attrs["names"], sims):
+        if sim >= 0.6:
+            # Confidence based on attribute type and similarity
+            base_conf = 0.85 if attr in ['id', 'data-testid'] else 0.75
+            matches.append((index, base_conf * sim, f"attribute_match_{attr}"))
+    return matches
+
+
+async def _add_snapshot_candidates(snapshot: dict, matches: list, candidates: dict):
+    """Turn scored snapshot matches into candidates, extracting info in one roundtrip."""
+    infos = await get_harvested_info(snapshot, [index for index, _, _ in matches])
+    for info, (_, confidence, strategy) in zip(infos, matches):
+        _add_candidate(candidates, info, confidence, strategy)
+
+
+def _add_candidate(candidates: dict, info: dict, confidence: float, strategy: str):
+    """Record a candidate, keeping only the most confident one per (xpath, tag)."""
+    key = (info.get("xpath", ""), info.get("tag", ""))
+    if not key[0]:
+        return
+    confidence = round(confidence, 3)
+    if key not in candidates or candidates[key]["confidence"] < confidence:
+        candidates[key] = {
+            **info,
+            "confidence": confidence,
+            "strategy": strategy
+        }
+
+
+def _rank_candidates(candidates: dict, top_n: int) -> list:
+    """Pick the top_n deduplicated candidates by confidence, add rank."""
+    # Same order as a stable descending sort, without sorting the whole pool
+    result = heapq.nlargest(top_n, candidates.values(), key=lambda x: x["confidence"])
     for i, c in enumerate(result, 1):
         c["rank"] = i
     return result
@@ -1,6 +1,6 @@
 """XPath generation logic using JavaScript evaluation."""
 
-from playwright.async_api import Page
+from playwright.async_api import Page, Error as PlaywrightError
 
 # JavaScript to extract robust XPath from an element (same as original find_xpath.py)
 _GET_ELEMENT_INFO_JS = """
@@ -16,16 +16,70 @@ _GET_ELEMENT_INFO_JS = """
         return `'${text}'`;
     }
 
+    /**
+     * Page-wide memo of XPath match counts. A new document gets a fresh
+     * window, and any DOM mutation clears the memo so counts never go stale.
+     */
+    if (!window.__xp_cache) {
+        window.__xp_cache = new Map();
+        window.__xp_elem_cache = new Map();
+        new MutationObserver(() => {
+            window.__xp_cache.clear();
+            window.__xp_elem_cache.clear();
+            window.__el_index = null;
+        }).observe(document, {
+            subtree: true, childList: true, attributes: true, characterData: true
+        });
+    }
+
+    /**
+     * One-pass index of "tag|attr|value" -> element count (plus "*|attr|value")
+     * for the attributes used in simple predicates. Built lazily, dropped on
+     * DOM mutation along with the count cache.
+     */
+    const INDEXED_ATTRS = ['id', 'data-testid', 'name', 'type'];
+    const SIMPLE_XPATH = /^\/\/([a-z0-9]+|\*)\[@(id|data-testid|name|type)='([^']*)'\]$/;
+
+    function getIndex() {
+        if (window.__el_index) return window.__el_index;
+        const index = new Map();
+        const bump = (key) => index.set(key, (index.get(key) || 0) + 1);
+        for (const node of document.querySelectorAll('*')) {
+            // XPath name tests only fold case for HTML elements
+            if (node.namespaceURI !== 'http://www.w3.org/1999/xhtml') continue;
+            const t = node.tagName.toLowerCase();
+            for (const a of INDEXED_ATTRS) {
+                const v = node.getAttribute(a);
+                if (v === null) continue;
+                bump(`${t}|${a}|${v}`);
+                bump(`*|${a}|${v}`);
+            }
+        }
+        window.__el_index = index;
+        return index;
+    }
+
     /**
      * Count elements matching an XPath
      */
     function countXPath(xpath) {
+        const cache = window.__xp_cache;
+        if (cache.has(xpath)) return cache.get(xpath);
+        let count;
+        const simple = xpath.match(SIMPLE_XPATH);
+        if (simple) {
+            count = getIndex().get(`${simple[1]}|${simple[2]}|${simple[3]}`) || 0;
+            cache.set(xpath, count);
+            return count;
+        }
         try {
             const result = document.evaluate(xpath, document, null, XPathResult.ORDERED_NODE_SNAPSHOT_TYPE, null);
-            return result.snapshotLength;
+            count = result.snapshotLength;
         } catch (e) {
-            return 0;
+            count = 0;
         }
+        cache.set(xpath, count);
+        return count;
     }
 
     /**
@@ -147,7 +201,30 @@ _GET_ELEMENT_INFO_JS = """
         return {xpath: baseXPath, count: siblings.snapshotLength};
     }
     
-    const xpathInfo = getRobustXPath(el);
+    /**
+     * getRobustXPath memoized by attribute signature. Look-alike widgets
+     * (e.g. a grid of identical buttons) share one entry; a cached XPath is
+     * reused only if it still uniquely resolves to this very element.
+     */
+    function getCachedRobustXPath(element) {
+        const attr = (name) => element.getAttribute(name) || '';
+        const key = [
+            element.tagName, element.id, element.className, attr('data-testid'), attr('name'),
+            attr('type'), attr('value'), attr('placeholder'), attr('aria-label'),
+            (element.innerText || '').slice(0, 50)
+        ].join('|');
+        const cache = window.__xp_elem_cache;
+        const cached = cache.get(key);
+        if (cached && cached.count === 1 && countXPath(cached.xpath) === 1) {
+            const node = document.evaluate(cached.xpath, document, null, XPathResult.FIRST_ORDERED_NODE_TYPE, null).singleNodeValue;
+            if (node === element) return cached;
+        }
+        const info = getRobustXPath(element);
+        cache.set(key, info);
+        return info;
+    }
+    
+    const xpathInfo = getCachedRobustXPath(el);
     
     const attrs = {};
     for (const attr of el.attributes) {
@@ -173,10 +250,139 @@ _GET_ELEMENT_INFO_JS = """
 """
 
 
+def _empty_info() -> dict:
+    return {"xpath": "", "match_count": 0, "css": "", "tag": "", "text": "", "attributes": {}}
+
+
 async def get_element_info(page: Page, element) -> dict:
     """Extract xpath and metadata from a Playwright element."""
     try:
         handle = await element.element_handle()
         return await page.evaluate(_GET_ELEMENT_INFO_JS, handle)
-    except:
-        return {"xpath": "", "match_count": 0, "css": "", "tag": "", "text": "", "attributes": {}}
+    except PlaywrightError:
+        return _empty_info()
+
+
+# Collects, in one pass over the DOM, everything the text and attribute
+# strategies score against: up to textLimit usable inner texts (non-empty,
+# at most 200 chars) from the elements matching textSelectors, taken tier by
+# tier so the earlier selectors fill the budget first, and for each
+# attribute the value on the first attrLimit elements carrying it.  The
+# nodes stay in the page; records refer to them by index so only the
+# winners need an XPath computed.
+_HARVEST_JS = """
+({textSelectors, textLimit, attrTag, attrs, attrLimit}) => {
+    const nodes = [];
+    const seen = new Map();
+    const indexOf = (el) => {
+        let i = seen.get(el);
+        if (i === undefined) {
+            i = nodes.length;
+            nodes.push(el);
+            seen.set(el, i);
+        }
+        return i;
+    };
+
+    // Records are returned as parallel columns (node index, value, ...)
+    // so Python can hand each value column to the scorer as-is
+    const texts = {nodes: [], values: []};
+    tiers: for (const selector of textSelectors) {
+        for (const el of document.querySelectorAll(selector)) {
+            if (texts.values.length >= textLimit) break tiers;
+            if (seen.has(el)) continue;
+            const text = el.innerText;
+            if (typeof text === 'string' && text && text.length <= 200) {
+                texts.nodes.push(indexOf(el));
+                texts.values.push(text);
+            }
+        }
+    }
+
+    // One walk over the union selector fills every attribute's list; the
+    // per-attribute counts keep each list to its first attrLimit elements
+    const values = {};
+    const taken = {};
+    for (const attr of attrs) {
+        values[attr] = [];
+        taken[attr] = 0;
+    }
+    let open = attrs.length;
+    for (const el of document.querySelectorAll(attrs.map(a => `${attrTag}[${a}]`).join(','))) {
+        for (const attr of attrs) {
+            if (taken[attr] >= attrLimit || !el.hasAttribute(attr)) continue;
+            if (++taken[attr] === attrLimit) open--;
+            const value = el.getAttribute(attr);
+            if (value) values[attr].push([indexOf(el), value]);
+        }
+        if (!open) break;
+    }
+    // Flattened attribute by attribute, in the order given
+    const columns = {nodes: [], names: [], values: []};
+    for (const attr of attrs) {
+        for (const [i, value] of values[attr]) {
+            columns.nodes.push(i);
+            columns.names.push(attr);
+            columns.values.push(value);
+        }
+    }
+    return {nodes, texts, attrs: columns};
+}
+"""
+
+_HARVEST_RECORDS_JS = "(h) => ({texts: h.texts, attrs: h.attrs})"
+
+_GET_HARVESTED_INFO_JS = f"""
+(h, indices) => {{
+    const getInfo = {_GET_ELEMENT_INFO_JS};
+    return indices.map(i => h.nodes[i] ? getInfo(h.nodes[i]) : null);
+}}
+"""
+
+
+async def harvest_dom(page: Page, text_selectors: list[str], attr_tag: str, attrs: list[str],
+                      text_limit: int = 100, attr_limit: int = 50) -> dict:
+    """Snapshot element texts and attribute values in two evaluate calls.
+
+    Texts are taken from *text_selectors* in order of preference: a later
+    selector only contributes once the earlier ones are exhausted.
+
+    Returns ``{"handle": JSHandle, "texts": {"nodes": [...], "values": [...]},
+    "attrs": {"nodes": [...], "names": [...], "values": [...]}, "info": {}}``
+    with parallel columns; attribute records are grouped by attribute in
+    the order of *attrs*.  Node indices refer to nodes held by the handle;
+    pass them to ``get_harvested_info`` (which fills the "info" memo) and
+    dispose the handle when done.
+    """
+    handle = await page.evaluate_handle(_HARVEST_JS, {
+        "textSelectors": text_selectors,
+        "textLimit": text_limit,
+        "attrTag": attr_tag,
+        "attrs": attrs,
+        "attrLimit": attr_limit,
+    })
+    try:
+        records = await handle.evaluate(_HARVEST_RECORDS_JS)
+    except PlaywrightError:
+        await handle.dispose()
+        raise
+    return {"handle": handle, "texts": records["texts"], "attrs": records["attrs"], "info": {}}
+
+
+async def get_harvested_info(snapshot: dict, indices: list[int]) -> list[dict]:
+    """Extract xpath and metadata for harvested nodes, one info dict per index.
+
+    Infos are memoized on the snapshot, so a node matched again (by another
+    strategy or another hint sharing the snapshot) costs no browser call;
+    the rest are described once each, in a single evaluate call.
+    """
+    cache = snapshot["info"]
+    missing = [i for i in dict.fromkeys(indices) if i not in cache]
+    if missing:
+        try:
+            infos = await snapshot["handle"].evaluate(_GET_HARVESTED_INFO_JS, missing)
+        except PlaywrightError:
+            return [cache.get(i) or _empty_info() for i in indices]
+        for i, info in zip(missing, infos):
+            cache[i] = info or _empty_info()
+    return [cache[i] for i in indices]